@@ -0,0 +1,95 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+
+class CalendarClientPool:
+    """
+    Pool of Calendar API services, each owning its own httplib2 connection as httplib2 is not thread-safe.
+    A service is checked out by one thread at a time and handed back for reuse, keeping its connection alive.
+    The credentials are shared by all services and refreshed in the background ahead of their expiry, every refresh of
+    them, including the ones the services make on their own, holds the same lock.
+    """
+
+    def __init__(self, creds=None, token_path: str = 'token.json', api_root: str = None, max_idle: int = 8,
+                 refresh_margin_seconds: int = 300) -> None:
+        """
+        :param creds: OAuth credentials, can be None only when talking to a stand-in
+        :param api_root: root url of a local stand-in for the Calendar API, None for Google
+        """
+        self.creds = creds
+        self.token_path = token_path
+        self.api_root = api_root
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self._idle = queue.LifoQueue(maxsize=max_idle)
+        self._creds_lock = threading.RLock()
+        if creds: self._serialize_refreshes()
+
+    def _serialize_refreshes(self):
+        # the AuthorizedHttp of each service refreshes the shared credentials from its request thread when they turn
+        # invalid or Google answers 401, route that through the lock of the background refresher too
+        refresh = self.creds.refresh
+
+        def locked_refresh(request):
+            token = self.creds.token
+            with self._creds_lock:
+                if self.creds.token != token and self.creds.valid: return  # another thread refreshed them meanwhile
+                refresh(request)
+
+        self.creds.refresh = locked_refresh
+
+    def _build(self):
+        import google_auth_httplib2
+        import httplib2
+        from googleapiclient.discovery import build
+        if self.api_root:
+            return build('calendar', 'v3', http=httplib2.Http(), static_discovery=True,
+                         client_options={'api_endpoint': f"{self.api_root}calendar/v3/"})
+        http = google_auth_httplib2.AuthorizedHttp(self.creds, http=httplib2.Http())
+        return build('calendar', 'v3', http=http, static_discovery=True)
+
+    @contextmanager
+    def client(self):
+        try:
+            service = self._idle.get_nowait()
+        except queue.Empty:
+            service = self._build()
+        try:
+            yield service
+        finally:
+            try:
+                self._idle.put_nowait(service)
+            except queue.Full:
+                pass
+
+    def _seconds_to_refresh(self) -> float:
+        if not self.creds.expiry: return self.refresh_margin_seconds
+        # google-auth keeps expiry as a naive utc datetime
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return (self.creds.expiry - now).total_seconds() - self.refresh_margin_seconds
+
+    def refresh(self):
+        from google.auth.transport.requests import Request
+        with self._creds_lock:
+            self.creds.refresh(Request())
+            with open(self.token_path, 'w') as token:
+                token.write(self.creds.to_json())
+        print(f"Refreshed calendar credentials, valid till {self.creds.expiry}")
+
+    def _refresh_periodically(self):
+        while True:
+            wait = self._seconds_to_refresh()
+            if wait > 0:
+                time.sleep(wait)
+                continue
+            try:
+                self.refresh()
+            except Exception as e:
+                print("Failed refreshing calendar credentials, retrying in a minute ", e)
+                time.sleep(60)
+
+    def start_refresher(self):
+        if not self.creds or not self.creds.refresh_token: return
+        threading.Thread(target=self._refresh_periodically, name='calendar-token-refresher', daemon=True).start()
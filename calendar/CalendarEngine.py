@@ -1,22 +1,63 @@
 from flask import Flask, request
 from flask_cors import CORS
+import argparse
+import hashlib
+import json
 import logging
-from datetime import timedelta, datetime
+import re
+import threading
+import time
+from datetime import timedelta, datetime, timezone
+from zoneinfo import ZoneInfo
 import os.path
 import os
+import sys
 
 # pip install --upgrade google-api-python-client google-auth-httplib2 google-auth-oauthlib
 
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+# the google auth and discovery clients are imported where used, warm-up loads them after the server is up
 from googleapiclient.errors import HttpError
 
+from CalendarClientPool import CalendarClientPool
+from CalendarJournal import CalendarJournal
+from CalendarMirror import CalendarMirror
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from monitoring.Readiness import instrument_readiness, warm_up, watch
+from monitoring.ServiceMetrics import instrument_app, upstream_call
+from monitoring.ServiceStartup import is_serving_process
+
 app = Flask(__name__)
 CORS(app)
+instrument_app(app)
+instrument_readiness(app)
 SCOPES = ["https://www.googleapis.com/auth/calendar"]
 
+parser = argparse.ArgumentParser()
+parser.add_argument('--port', type=int, help='Port number to use', default=8089, required=False)
+parser.add_argument('--calendarApiRoot', type=str, required=False, default=None,
+                    help='Root url of a local stand-in for the Calendar API, e.g. http://localhost:9999/ for '
+                         'python tests/calendar_standin.py. Skips the OAuth flow when supplied')
+parser.add_argument('--writeBehind', type=bool, help='Acknowledge writes after journaling them locally?',
+                    default=False, required=False)
+parser.add_argument('--journalDb', type=str, help='SQLite file backing the write-behind journal',
+                    default='calendar-journal.db', required=False)
+parser.add_argument('--mirrorDb', type=str, help='SQLite file backing the local calendar mirror',
+                    default='calendar-mirror.db', required=False)
+parser.add_argument('--mirrorSyncSeconds', type=int, help='Seconds between incremental syncs of the mirror',
+                    default=60, required=False)
+args: argparse.Namespace = None
+
+calendar_batch_limit = 50  # max calls allowed by the Calendar API in a single batch request
+journal_poll_seconds = 5
+max_query_limit = 2500  # most events /cal/events answers with at once
+retryable_client_errors = {408, 429}  # any other 4xx answer stays the same however often the write is retried
+journal: CalendarJournal = None
+journal_wakeup = threading.Event()
+journal_writer: threading.Thread = None
+journal_writer_error: str = None  # what failed the last pass of the journal writer, None once a pass succeeds
+calendar_mirror: CalendarMirror = None
+
 color_code_dict = {
     "#33b679": 2,  # sage
     "#0b8043": 10,  # basil
@@ -29,16 +70,49 @@ event_color_code_dict = {
     'lib': '#3F51B5',
     'exp': '#D50000',
 }
-edt_est_time_diff = {
-    "EDT": "-04",
-    "EST": "-05"
-}
-timezone = "EST"  # CHANGE ONCE DAYLIGHT GOES ON / OFF
-time_diff = edt_est_time_diff[timezone]
-service = None
+calendar_timezone = 'Canada/Eastern'
+calendar_zone = ZoneInfo(calendar_timezone)  # offsets follow daylight saving on their own
+recurrence_frequencies = {'DAILY', 'WEEKLY', 'MONTHLY', 'YEARLY'}
+recurrence_day_pattern = re.compile(r"([+-]?\d{1,2})?(MO|TU|WE|TH|FR|SA|SU)")
+calendar_clients: CalendarClientPool = None
+
+
+class CalendarNotReady(Exception):
+    pass
+
+
+def configure(argv: list[str] = None):
+    """
+    Parse the command line and set up what depends on it.
+    """
+    global args, journal, calendar_mirror
+    args = parser.parse_args(argv)
+    journal = CalendarJournal(args.journalDb) if args.writeBehind else None
+    calendar_mirror = CalendarMirror(args.mirrorDb)
+    if args.writeBehind:
+        watch('journal-writer', check_journal_writer)
+
+
+def get_calendar_clients() -> CalendarClientPool:
+    if not calendar_clients: raise CalendarNotReady("Calendar credentials are not ready yet, see /ready")
+    return calendar_clients
+
+
+@app.errorhandler(CalendarNotReady)
+def calendar_not_ready(e):
+    return {'error': str(e)}, 503, {'Retry-After': '5'}
 
 
 def create_token_if_expired():
+    global calendar_clients
+    if args.calendarApiRoot:
+        calendar_clients = CalendarClientPool(api_root=args.calendarApiRoot)
+        return
+
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import InstalledAppFlow
+
     creds = None
     # The file token.json stores the user's access and refresh tokens, and is
     # created automatically when the authorization flow completes for the first
@@ -56,25 +130,106 @@ def create_token_if_expired():
         # Save the credentials for the next run
         with open('token.json', 'w') as token:
             token.write(creds.to_json())
-    global service
-    service = build('calendar', 'v3', credentials=creds)
+    calendar_clients = CalendarClientPool(creds, token_path='token.json')
+
+
+def connect_calendar():
+    """
+    Get hold of the calendar credentials, which may need the user to log in, then start the workers calling Google.
+    Runs in the background, until it is done only the requests writing straight to Google answer 503.
+    """
+    global journal_writer
+    try:
+        create_token_if_expired()
+    except Exception as e:
+        print("Removing the token.json as it seems to have expired. Requesting new login for new token generation now!")
+        os.remove("token.json")
+        create_token_if_expired()  # retrying to get the new token created
+
+    with calendar_clients.client():
+        pass  # builds the first service off the discovery document ahead of the first request
+    calendar_clients.start_refresher()
+    threading.Thread(target=sync_mirror_periodically, name='calendar-mirror-sync', daemon=True).start()
+    if args.writeBehind:
+        journal_writer = threading.Thread(target=drain_journal, name='calendar-journal-writer', daemon=True)
+        journal_writer.start()
+
+
+def _as_list(value) -> list:
+    return [value] if isinstance(value, str) else list(value)
+
+
+def _positive_int(spec: dict, key: str) -> int:
+    value = spec[key]
+    if isinstance(value, bool) or not str(value).isdigit() or int(value) <= 0:
+        raise ValueError(f"Recurrence {key} has to be a positive integer, got {value!r}")
+    return int(value)
+
+
+def _recurrence_day(day) -> str:
+    # MO..SU, optionally prefixed with the occurrence within the month or year, e.g. 1MO or -1FR
+    code = str(day).strip().upper()
+    match = recurrence_day_pattern.fullmatch(code)
+    if not match or (match.group(1) and not 1 <= abs(int(match.group(1))) <= 53):
+        raise ValueError(f"Unsupported recurrence day: {day!r}")
+    return code
+
+
+def generate_recurrence(spec: dict, dt_start: datetime) -> list[str]:
+    """
+    Build the RFC 5545 recurrence lines for a recurring event.
+    :param spec: {"Frequency": "DAILY" | "WEEKLY" | "MONTHLY" | "YEARLY", "Interval": 1, "ByDay": ["MO", "WE"] or "MO",
+                  "Count": 12 or "Until": "2026-12-20", "Exceptions": ["2026-11-10", ...]}
+    :param dt_start: zone aware start of the first occurrence
+    """
+    if not isinstance(spec, dict):
+        raise ValueError(f"Recurrence has to be an object, got {spec!r}")
+    frequency = str(spec.get('Frequency', '')).upper()
+    if frequency not in recurrence_frequencies:
+        raise ValueError(f"Unsupported recurrence frequency: {spec.get('Frequency')}")
+    if spec.get('Count') is not None and spec.get('Until') is not None:
+        raise ValueError("Recurrence takes either Count or Until, not both")
+
+    rule = f"RRULE:FREQ={frequency}"
+    if spec.get('Interval') is not None:
+        rule += f";INTERVAL={_positive_int(spec, 'Interval')}"
+    if spec.get('ByDay'):
+        rule += f";BYDAY={','.join(_recurrence_day(day) for day in _as_list(spec['ByDay']))}"
+    if spec.get('Count') is not None:
+        rule += f";COUNT={_positive_int(spec, 'Count')}"
+    if spec.get('Until') is not None:
+        # UNTIL has to be in utc when the start carries a time zone, keep the whole last day
+        until = datetime.strptime(str(spec['Until'])[:10], "%Y-%m-%d").replace(hour=23, minute=59, second=59,
+                                                                               tzinfo=calendar_zone)
+        rule += f";UNTIL={until.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}"
+    recurrence = [rule]
+
+    if spec.get('Exceptions'):
+        skipped = [f"{datetime.strptime(day[:10], '%Y-%m-%d').strftime('%Y%m%d')}T{dt_start.strftime('%H%M%S')}"
+                   for day in _as_list(spec['Exceptions'])]
+        recurrence.append(f"EXDATE;TZID={calendar_timezone}:{','.join(skipped)}")
+    return recurrence
 
 
 def generate_event(title, start_date, start_time='0000', color_code='#D50000', duration_minutes=1440, description=None,
-                   all_day=False):
+                   all_day=False, recurrence: dict = None):
     from datetime import datetime
 
     date_start, date_end = None, None
 
     start_date = start_date[:start_date.index("T")]
     start_date_str = f"{start_date}T{start_time}"
-    dt_start = datetime.strptime(start_date_str, "%Y-%m-%dT%H%M")
+    dt_start = datetime.strptime(start_date_str, "%Y-%m-%dT%H%M").replace(tzinfo=calendar_zone)
     logging.log(logging.INFO, dt_start)
 
-    date_start = dt_start.strftime(f"%Y-%m-%dT%H:%M:%S{time_diff}:00")  # change this -04 to -05 when EDT gets over
+    date_start = dt_start.isoformat()
 
-    dt_end = dt_start + timedelta(minutes=duration_minutes)
-    date_end = dt_end.strftime(f"%Y-%m-%dT%H:%M:%S{time_diff}:00")
+    if all_day:
+        dt_end = dt_start + timedelta(minutes=duration_minutes)  # on the wall clock, ends at midnight on any day
+    else:
+        # the duration is elapsed time, a session running across a daylight saving change ends an hour off otherwise
+        dt_end = (dt_start.astimezone(timezone.utc) + timedelta(minutes=duration_minutes)).astimezone(calendar_zone)
+    date_end = dt_end.isoformat()
 
     color_code = color_code_dict.get(color_code, 11)
     # https://lukeboyle.com/blog/posts/google-calendar-api-color-id
@@ -86,15 +241,15 @@ def generate_event(title, start_date, start_time='0000', color_code='#D50000', d
         # matches the yellow-orange color being used manually =>   '5': {'background': '#fbd75b', 'foreground': '#1d1d1d'},
         'start': {
             'dateTime': date_start,
-            'timeZone': 'Canada/Eastern',
+            'timeZone': calendar_timezone,
         },
         'end': {
             'dateTime': date_end,
-            'timeZone': 'Canada/Eastern',
-            # 'timeZone': 'Etc/GMT-4',
-            # 'timeZone': 'EST5EDT',
+            'timeZone': calendar_timezone,
         },
     }
+    if recurrence:
+        event['recurrence'] = generate_recurrence(recurrence, dt_start)
     if description:
         event['description'] = description
     if all_day:
@@ -109,20 +264,242 @@ def generate_event(title, start_date, start_time='0000', color_code='#D50000', d
     return event
 
 
-@app.route('/cal/session', methods=['POST'])
-def create_session():
-    # create session node
-    data = request.get_json()
+def new_batch_http_request(service, callback):
+    if args.calendarApiRoot:
+        from googleapiclient.http import BatchHttpRequest
+        return BatchHttpRequest(callback=callback, batch_uri=f"{args.calendarApiRoot}batch/calendar/v3")
+    return service.new_batch_http_request(callback=callback)
+
+
+def is_all_day(event: dict) -> bool:
+    # all_day events are written as timed events running from midnight to midnight, on the wall clock as the day of a
+    # daylight saving change lasts 23 or 25 hours
+    start, end = event.get('start', {}), event.get('end', {})
+    if 'date' in start: return True
+    try:
+        dt_start, dt_end = datetime.fromisoformat(start['dateTime']), datetime.fromisoformat(end['dateTime'])
+    except (KeyError, TypeError, ValueError):
+        return False
+    return dt_start.time() == dt_end.time() == datetime.min.time() and \
+        dt_end.date() - dt_start.date() == timedelta(days=1)
+
+
+def insert_events(events: list[dict]) -> list[dict]:
+    """
+    Insert events onto the primary calendar, skipping the ones the local mirror already has as well as repeats within
+    the supplied events. A timed event is a duplicate of one with the same title starting at the same time, an all day
+    event of one with the same title on the same day.
+    :return: per event result, in order of the events supplied, with either the htmlLink or the error
+    """
+    results = [None] * len(events)
+    fresh, seen = [], set()
+    for index, event in enumerate(events):
+        identity = (event.get('summary'), json.dumps(event.get('start'), sort_keys=True))
+        existing = calendar_mirror.find_duplicate(event, whole_day=is_all_day(event))
+        if existing or identity in seen:
+            results[index] = {**(existing or {}), 'duplicate': True}
+            continue
+        seen.add(identity)
+        fresh.append(index)
+
+    if fresh:
+        inserted = insert_events_upstream([events[index] for index in fresh])
+        for index, result in zip(fresh, inserted):
+            results[index] = result
+        calendar_mirror.upsert([{**events[index], 'id': result['id'], 'htmlLink': result['htmlLink']}
+                                for index, result in zip(fresh, inserted) if 'error' not in result])
+    return results
+
+
+def insert_events_upstream(events: list[dict]) -> list[dict]:
+    """
+    Insert events through the Calendar API. More than one event goes through Google batch requests, each carrying
+    at most calendar_batch_limit inserts.
+    """
+    if len(events) == 1:
+        try:
+            with get_calendar_clients().client() as service, upstream_call('google_calendar', 'insert'):
+                event = service.events().insert(calendarId='primary', body=events[0]).execute()
+            return [{'id': event.get('id'), 'htmlLink': event.get('htmlLink')}]
+        except HttpError as e:
+            return [{'error': str(e), 'status': e.resp.status}]
+
+    results = [None] * len(events)
+
+    def collect(request_id, response, exception):
+        index = int(request_id)
+        if exception:
+            results[index] = {'error': str(exception),
+                              'status': getattr(getattr(exception, 'resp', None), 'status', None)}
+        else:
+            results[index] = {'id': response.get('id'), 'htmlLink': response.get('htmlLink')}
+
+    with get_calendar_clients().client() as service:
+        for chunk_start in range(0, len(events), calendar_batch_limit):
+            batch = new_batch_http_request(service, collect)
+            for index in range(chunk_start, min(chunk_start + calendar_batch_limit, len(events))):
+                batch.add(service.events().insert(calendarId='primary', body=events[index]), request_id=str(index))
+            with upstream_call('google_calendar', 'batch_insert'):
+                batch.execute()
+    return results
+
+
+def respond_with_results(results: list[dict]):
+    """
+    :return: the per event results, with a 502 carrying the upstream status of the first failure when any write failed
+    """
+    failed = [result for result in results if 'error' in result]
+    if not failed: return {'events': results}, 200
+    return {'events': results, 'upstreamStatus': failed[0].get('status')}, 502
+
+
+def event_idempotency_key(event: dict, request_key: str = None, index: int = 0) -> str:
+    if request_key: return f"{request_key}:{index}"
+    return hashlib.sha256(json.dumps(event, sort_keys=True).encode()).hexdigest()
+
+
+def enqueue_events(events: list[dict], request_key: str = None) -> list[dict]:
+    """
+    Journal events for the background writer instead of calling Google inline.
+    :param request_key: Idempotency-Key supplied by the caller, the event content is hashed when absent
+    :return: per event idempotency key and whether it got queued now (False for an already known key)
+    """
+    entries = []
+    for index, event in enumerate(events):
+        key = event_idempotency_key(event, request_key, index)
+        # a client supplied event id makes Google reject a replay of an already written event with a 409
+        entries.append((key, {**event, 'id': hashlib.sha256(key.encode()).hexdigest()}))
+    queued = journal.enqueue(entries)
+    journal_wakeup.set()
+    return [{'key': key, 'queued': is_new} for (key, _), is_new in zip(entries, queued)]
+
+
+def write_due_events() -> int:
+    """
+    Write the journaled events that are due to Google and record the outcome of each in the journal.
+    :return: number of events handled
+    """
+    entries = journal.get_due(calendar_batch_limit)
+    if not entries: return 0
+
+    try:
+        results = insert_events([event for _, event in entries])
+    except Exception as e:
+        results = [{'error': str(e)}] * len(entries)
+    for (key, _), result in zip(entries, results):
+        if 'error' not in result:
+            journal.mark_done(key, result.get('htmlLink'))
+        elif result.get('status') == 409:
+            journal.mark_done(key)  # written by an earlier attempt whose response got lost
+        elif result.get('status') and 400 <= result['status'] < 500 \
+                and result['status'] not in retryable_client_errors:
+            print(f"Google rejected journaled event {key}, not retrying: {result['error']}")
+            journal.mark_failed(key, result['error'])
+        else:
+            print(f"Failed writing journaled event {key}, will retry: {result['error']}")
+            journal.mark_retry(key, result['error'])
+    return len(entries)
+
+
+def drain_journal():
+    global journal_writer_error
+    while True:
+        try:
+            written = write_due_events()
+        except Exception as e:
+            # e.g. the journal database staying locked, keep the writer alive and report it on /ready meanwhile
+            print("Journal writer pass failed, retrying ", e)
+            journal_writer_error = repr(e)
+            time.sleep(journal_poll_seconds)
+            continue
+        journal_writer_error = None
+        if not written:
+            journal_wakeup.wait(journal_poll_seconds)
+            journal_wakeup.clear()
+
+
+def check_journal_writer() -> str | None:
+    if not journal_writer or not journal_writer.is_alive(): return "Journal writer is not running"
+    return journal_writer_error
+
+
+def sync_mirror_periodically():
+    while True:
+        try:
+            with calendar_clients.client() as service, upstream_call('google_calendar', 'sync'):
+                changes = calendar_mirror.sync(service)
+            if changes: print(f"Calendar mirror applied {changes} changes")
+        except Exception as e:
+            print("Failed syncing the calendar mirror ", e)
+        time.sleep(args.mirrorSyncSeconds)
+
+
+def build_session_events(data) -> list[dict]:
     title = f"{data['Mode']['SessionMode'].lower()} {data['Student'].lower()} {data['Subject']['SessionSubject'].lower()}"
     color_code = f"{data['Mode']['Color']}"
     start_dt = data['SessionDate']
     start_time = data['SessionStartTime']
     duration = data['SessionLengthInMinutes']
+    recurrence = data.get('Recurrence')  # a whole term of sessions becomes one recurring event
+
+    return [generate_event(title, start_dt, start_time, duration_minutes=duration, color_code=color_code,
+                           recurrence=recurrence)]
+
+
+def build_expiry_events(data) -> list[dict]:
+    title = f"expiry: {data['Data']}".lower()
+    start_dt = data['Date']
+
+    return [generate_event(title, start_dt, all_day=True, color_code=event_color_code_dict['exp'])]
+
+
+def build_lib_events(data) -> list[dict]:
+    book = data['BookName']
+    events = []
+
+    if data['BorrowDate']:
+        title = f"lib: borrowed - {book}"
+        events.append(generate_event(title, data['BorrowDate'], all_day=True, color_code=event_color_code_dict['lib']))
+
+    if data['ReturnDate']:
+        title = f"lib: to return - {book}"
+        events.append(generate_event(title, data['ReturnDate'], all_day=True, color_code=event_color_code_dict['lib']))
+
+    if data['ReturnedDate']:
+        title = f"lib: returned - {book}"
+        events.append(
+            generate_event(title, data['ReturnedDate'], all_day=True, color_code=event_color_code_dict['lib']))
+
+    return events
+
+
+event_builders = {
+    'session': build_session_events,
+    'expiry': build_expiry_events,
+    'lib': build_lib_events,
+}
 
-    event = generate_event(title, start_dt, start_time, duration_minutes=duration, color_code=color_code)
-    event = service.events().insert(calendarId='primary', body=event).execute()
-    print(f"Event created: {event.get('htmlLink')}")
-    return {}, 200
+
+@app.route('/ping', methods=['GET'])
+def ping():
+    timestamp = (int)(time.time() * 1000)
+    print(f"PINGING back with status {timestamp}")
+    return f"ALIVE-{timestamp}"
+
+
+@app.route('/cal/session', methods=['POST'])
+def create_session():
+    # create session node
+    data = request.get_json()
+    try:
+        events = build_session_events(data)
+    except (KeyError, TypeError, ValueError) as e:
+        return {'error': f"Invalid request: {e!r}"}, 400
+    if args.writeBehind: return {'queued': enqueue_events(events, request.headers.get('Idempotency-Key'))}, 202
+
+    results = insert_events(events)
+    print(f"Event created: {results[0]}")
+    return respond_with_results(results)
 
 
 @app.route('/cal/expiry', methods=['POST'])
@@ -130,13 +507,15 @@ def create_expiry():
     # create expiry node
     data = request.get_json()
     print(data)
-    title = f"expiry: {data['Data']}".lower()
-    start_dt = data['Date']
+    try:
+        events = build_expiry_events(data)
+    except (KeyError, TypeError, ValueError) as e:
+        return {'error': f"Invalid request: {e!r}"}, 400
+    if args.writeBehind: return {'queued': enqueue_events(events, request.headers.get('Idempotency-Key'))}, 202
 
-    event = generate_event(title, start_dt, all_day=True, color_code=event_color_code_dict['exp'])
-    event = service.events().insert(calendarId='primary', body=event).execute()
-    print(f"Event created: {event.get('htmlLink')}")
-    return {}, 200
+    results = insert_events(events)
+    print(f"Event created: {results[0]}")
+    return respond_with_results(results)
 
 
 @app.route('/cal/lib', methods=['POST'])
@@ -144,38 +523,84 @@ def create_lib_data():
     # create lib node
     data = request.get_json()
     # print(data)
-    book = data['BookName']
+    try:
+        events = build_lib_events(data)
+    except (KeyError, TypeError, ValueError) as e:
+        return {'error': f"Invalid request: {e!r}"}, 400
+    if args.writeBehind: return {'queued': enqueue_events(events, request.headers.get('Idempotency-Key'))}, 202
 
-    if data['BorrowDate']:
-        title = f"lib: borrowed - {book}"
-        dt = data['BorrowDate']
-        event = generate_event(title, dt, all_day=True, color_code=event_color_code_dict['lib'])
-        event = service.events().insert(calendarId='primary', body=event).execute()
-        print(f"Borrow date event created: {event.get('htmlLink')}")
+    results = insert_events(events) if events else []
+    for event, result in zip(events, results):
+        print(f"{event['summary']} event created: {result}")
 
-    if data['ReturnDate']:
-        title = f"lib: to return - {book}"
-        dt = data['ReturnDate']
-        event = generate_event(title, dt, all_day=True, color_code=event_color_code_dict['lib'])
-        event = service.events().insert(calendarId='primary', body=event).execute()
-        print(f"Return date event created: {event.get('htmlLink')}")
+    return respond_with_results(results)
+
+
+@app.route('/cal/batch', methods=['POST'])
+def create_batch():
+    """
+    Create events for many session / expiry / lib payloads through batched Calendar API calls.
+    Body is a list of {"Type": "session" | "expiry" | "lib", "Data": <payload of the respective endpoint>}
+    :return: list of per item results, in order, with the created (or queued in write-behind mode) events or the
+    error for that item
+    """
+    items = request.get_json()
+    request_key = request.headers.get('Idempotency-Key')
+    if not isinstance(items, list):
+        return {'error': 'Expected a list of items'}, 400
+
+    item_results, events, owners = [], [], []
+    for index, item in enumerate(items):
+        try:
+            item_events = event_builders[item['Type']](item['Data'])
+        except (KeyError, TypeError, ValueError) as e:
+            item_results.append({'type': item.get('Type') if isinstance(item, dict) else None,
+                                 'error': f"Invalid item: {e!r}"})
+            continue
+        if args.writeBehind:
+            item_key = f"{request_key}:{index}" if request_key else None
+            item_results.append({'type': item['Type'], 'queued': enqueue_events(item_events, item_key)})
+            continue
+        item_results.append({'type': item['Type'], 'events': []})
+        events.extend(item_events)
+        owners.extend([index] * len(item_events))
+
+    if events:
+        for owner, result in zip(owners, insert_events(events)):
+            item_results[owner]['events'].append(result)
+    print(f"Batch processed {len(items)} items")
+    return item_results, 202 if args.writeBehind else 200
+
+
+@app.route('/cal/events', methods=['GET'])
+def query_events():
+    """
+    Query events from the local mirror of the calendar, without calling Google.
+    :return: up to limit events, 500 by default and max_query_limit at most
+    """
+    # http://localhost:8089/cal/events?title=lib&from=2026-01-01&to=2026-12-31
+    limit = request.args.get('limit', '500')
+    if not limit.isdigit() or int(limit) < 1:
+        return {'error': f"limit has to be a positive integer, got {limit!r}"}, 400
+    return calendar_mirror.query(title=request.args.get('title'),
+                                 date_from=request.args.get('from'),
+                                 date_to=request.args.get('to'),
+                                 limit=min(int(limit), max_query_limit)), 200
 
-    if data['ReturnedDate']:
-        title = f"lib: returned - {book}"
-        dt = data['ReturnedDate']
-        event = generate_event(title, dt, all_day=True, color_code=event_color_code_dict['lib'])
-        event = service.events().insert(calendarId='primary', body=event).execute()
-        print(f"Returned date event created: {event.get('htmlLink')}")
 
-    return {}, 200
+@app.route('/cal/journal/<key>', methods=['GET'])
+def get_journal_status(key):
+    # http://localhost:8089/cal/journal/<idempotency key>
+    if not args.writeBehind: return {'error': 'Write-behind mode is not enabled'}, 404
+    status = journal.get_status(key)
+    if not status: return {'error': f"No journal entry for {key}"}, 404
+    return status, 200
 
 
 if __name__ == '__main__':
-    try:
-        create_token_if_expired()
-    except Exception as e:
-        print("Removing the token.json as it seems to have expired. Requesting new login for new token generation now!")
-        os.remove("token.json")
-        create_token_if_expired()  # retrying to get the new token created
+    configure()
+
+    if is_serving_process():
+        warm_up('calendar', connect_calendar)
 
-    app.run(port=8089, debug=True)
+    app.run(port=args.port, debug=True, threaded=True)
@@ -0,0 +1,100 @@
+import json
+import sqlite3
+import time
+from contextlib import closing
+
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class CalendarJournal:
+    """
+    Durable queue of calendar events waiting to be written to Google.
+    Every entry is keyed by an idempotency key, so re-submitting the same key never queues a second event.
+    """
+
+    def __init__(self, db_path: str, max_attempts: int = 8, max_backoff_seconds: int = 300) -> None:
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.max_backoff_seconds = max_backoff_seconds
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS journal (
+                    idempotency_key TEXT PRIMARY KEY,
+                    event TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL,
+                    last_error TEXT,
+                    html_link TEXT,
+                    created_at REAL NOT NULL
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS journal_due ON journal (status, next_attempt_at)")
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def enqueue(self, entries: list[tuple[str, dict]]) -> list[bool]:
+        """
+        Append events to the journal in one transaction.
+        :param entries: list of (idempotency key, event)
+        :return: per entry, True if it was queued now and False if the key was already known
+        """
+        now = time.time()
+        queued = []
+        with closing(self._connect()) as conn, conn:
+            for key, event in entries:
+                cursor = conn.execute("""
+                    INSERT OR IGNORE INTO journal (idempotency_key, event, status, next_attempt_at, created_at)
+                    VALUES (?, ?, ?, ?, ?)""", (key, json.dumps(event), PENDING, now, now))
+                queued.append(cursor.rowcount == 1)
+        return queued
+
+    def get_due(self, limit: int) -> list[tuple[str, dict]]:
+        """
+        :return: up to limit pending (idempotency key, event) entries whose next attempt is due, oldest first
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute("""
+                SELECT idempotency_key, event FROM journal
+                WHERE status = ? AND next_attempt_at <= ?
+                ORDER BY created_at LIMIT ?""", (PENDING, time.time(), limit)).fetchall()
+        return [(key, json.loads(event)) for key, event in rows]
+
+    def mark_done(self, key: str, html_link: str = None):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("""
+                UPDATE journal SET status = ?, html_link = COALESCE(?, html_link), attempts = attempts + 1
+                WHERE idempotency_key = ?""", (DONE, html_link, key))
+
+    def mark_retry(self, key: str, error: str):
+        """
+        Record a failed attempt and schedule the next one with exponential backoff, giving up after max_attempts.
+        """
+        with closing(self._connect()) as conn, conn:
+            attempts = conn.execute("SELECT attempts FROM journal WHERE idempotency_key = ?", (key,)).fetchone()[0] + 1
+            status = FAILED if attempts >= self.max_attempts else PENDING
+            next_attempt_at = time.time() + min(2 ** attempts, self.max_backoff_seconds)
+            conn.execute("""
+                UPDATE journal SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ?
+                WHERE idempotency_key = ?""", (status, attempts, next_attempt_at, error, key))
+
+    def mark_failed(self, key: str, error: str):
+        """
+        Give up on an event Google rejected for good, e.g. a malformed one, without spending the retries on it.
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute("""
+                UPDATE journal SET status = ?, attempts = attempts + 1, last_error = ?
+                WHERE idempotency_key = ?""", (FAILED, error, key))
+
+    def get_status(self, key: str) -> dict | None:
+        with closing(self._connect()) as conn:
+            row = conn.execute("""
+                SELECT status, attempts, last_error, html_link FROM journal WHERE idempotency_key = ?""",
+                               (key,)).fetchone()
+        if not row: return None
+        status, attempts, last_error, html_link = row
+        return {'key': key, 'status': status, 'attempts': attempts, 'error': last_error, 'htmlLink': html_link}
@@ -0,0 +1,146 @@
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime
+
+from googleapiclient.errors import HttpError
+
+
+def _start_of(event: dict) -> str:
+    start = event.get('start', {})
+    return start.get('dateTime') or start.get('date') or ''
+
+
+def _same_instant(start: str, other: str) -> bool:
+    # google may render the same start with another offset than the one it was written with
+    try:
+        return datetime.fromisoformat(start) == datetime.fromisoformat(other)
+    except (TypeError, ValueError):
+        return start == other
+
+
+class CalendarMirror:
+    """
+    Local index of the primary calendar kept current with the Calendar API incremental sync.
+    A full listing happens once, later syncs only pull what changed since the stored sync token.
+    """
+
+    def __init__(self, db_path: str, calendar_id: str = 'primary') -> None:
+        self.db_path = db_path
+        self.calendar_id = calendar_id
+        self._sync_lock = threading.Lock()
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS event (
+                    id TEXT PRIMARY KEY,
+                    summary TEXT,
+                    start_date TEXT,
+                    start TEXT,
+                    end TEXT,
+                    html_link TEXT
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS event_summary_date ON event (summary, start_date)")
+            conn.execute("CREATE INDEX IF NOT EXISTS event_date ON event (start_date)")
+            conn.execute("CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)")
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    @staticmethod
+    def _apply(conn, events: list[dict]):
+        deleted = [(event['id'],) for event in events if event.get('status') == 'cancelled']
+        live = [(event['id'], event.get('summary'), _start_of(event)[:10], _start_of(event),
+                 event.get('end', {}).get('dateTime') or event.get('end', {}).get('date'), event.get('htmlLink'))
+                for event in events if event.get('status') != 'cancelled']
+        conn.executemany("DELETE FROM event WHERE id = ?", deleted)
+        conn.executemany("INSERT OR REPLACE INTO event VALUES (?, ?, ?, ?, ?, ?)", live)
+
+    def upsert(self, events: list[dict]):
+        """
+        Record events just written by this service without waiting for the next sync.
+        """
+        with closing(self._connect()) as conn, conn:
+            self._apply(conn, events)
+
+    def sync(self, service) -> int:
+        """
+        Pull changes since the last sync, falling back to a full sync when there is no token or Google expired it.
+        :return: number of changed events applied
+        """
+        with self._sync_lock:
+            with closing(self._connect()) as conn:
+                row = conn.execute("SELECT value FROM sync_state WHERE key = 'sync_token'").fetchone()
+            sync_token = row[0] if row else None
+            try:
+                return self._sync_pages(service, sync_token)
+            except HttpError as e:
+                if e.resp.status != 410: raise
+                print("Calendar sync token expired, running a full sync")
+                return self._sync_pages(service, None)
+
+    def _sync_pages(self, service, sync_token: str | None) -> int:
+        changes, page_token = [], None
+        while True:
+            params = {'calendarId': self.calendar_id, 'maxResults': 2500}
+            if page_token:
+                params['pageToken'] = page_token
+            if sync_token:
+                params['syncToken'] = sync_token
+            page = service.events().list(**params).execute()
+            changes.extend(page.get('items', []))
+            page_token = page.get('nextPageToken')
+            if not page_token: break
+
+        with closing(self._connect()) as conn, conn:
+            if not sync_token:
+                conn.execute("DELETE FROM event")
+            self._apply(conn, changes)
+            conn.execute("INSERT OR REPLACE INTO sync_state VALUES ('sync_token', ?)", (page.get('nextSyncToken'),))
+        return len(changes)
+
+    def find(self, summary: str, start: str, whole_day: bool = False) -> dict | None:
+        """
+        :param start: iso formatted start, a dateTime or a yyyy-mm-dd date
+        :param whole_day: match an event with exactly this title anywhere on the day of start, otherwise only one
+            starting at the same instant
+        :return: the matching event, if any
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute("""
+                SELECT id, summary, start, end, html_link FROM event WHERE summary = ? AND start_date = ?""",
+                                (summary, start[:10])).fetchall()
+        for row in rows:
+            if whole_day or _same_instant(row[2], start): return self._to_dict(row)
+        return None
+
+    def find_duplicate(self, event: dict, whole_day: bool = False) -> dict | None:
+        return self.find(event.get('summary'), _start_of(event), whole_day)
+
+    def query(self, title: str = None, date_from: str = None, date_to: str = None, limit: int = 500) -> list[dict]:
+        """
+        :param title: case-insensitive substring of the event title
+        :param date_from: yyyy-mm-dd, inclusive
+        :param date_to: yyyy-mm-dd, inclusive
+        """
+        clauses, params = [], []
+        if title:
+            clauses.append("summary LIKE ?")
+            params.append(f"%{title}%")
+        if date_from:
+            clauses.append("start_date >= ?")
+            params.append(date_from)
+        if date_to:
+            clauses.append("start_date <= ?")
+            params.append(date_to)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        with closing(self._connect()) as conn:
+            rows = conn.execute(f"""
+                SELECT id, summary, start, end, html_link FROM event {where} ORDER BY start LIMIT ?""",
+                                [*params, limit]).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    @staticmethod
+    def _to_dict(row) -> dict:
+        event_id, summary, start, end, html_link = row
+        return {'id': event_id, 'summary': summary, 'start': start, 'end': end, 'htmlLink': html_link}
@@ -2,25 +2,67 @@ import argparse
 import json
 import os
 import sys
+import time
 from dataclasses import dataclass, asdict
 
-import cvxpy as cp
 import numpy
 import numpy as np
-import py_eureka_client.eureka_client as eureka_client
 from flask import Flask, request, jsonify
 from flask_cors import CORS
+from prometheus_client import Histogram
+
+# cvxpy, grpc and the eureka client are imported where used, warm-up loads them after the server is up
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from model.output import mkt_data_pb2 as MarketData
+from monitoring.Readiness import import_modules, instrument_readiness, warm_up
+from monitoring.RequestProfiler import enable_profiling, record_phase
+from monitoring.ServiceMetrics import instrument_app
+from monitoring.ServiceStartup import is_serving_process, register_with_eureka, serve_grpc
 
 app = Flask(__name__)
 CORS(app)
+instrument_app(app)
+instrument_readiness(app)
 
 parser = argparse.ArgumentParser()
 parser.add_argument('--port', type=int, help='Port number to use', default=8101, required=False)
 parser.add_argument('--useEureka', type=bool, help='Use Eureka discovery?', default=False, required=False)
-args = parser.parse_args()
+parser.add_argument('--grpcPort', type=int, help='Port to serve gRPC on, gRPC is off when not supplied',
+                    default=None, required=False)
+parser.add_argument('--profiling', type=bool, help='Allow profiling single requests with ?profile=1?',
+                    default=False, required=False)
+parser.add_argument('--profileDir', type=str, help='Directory keeping request profiles',
+                    default='profiles', required=False)
+args: argparse.Namespace = None
+
+
+def configure(argv: list[str] = None):
+    """
+    Parse the command line and set up what depends on it.
+    """
+    global args
+    args = parser.parse_args(argv)
+    if args.profiling:
+        enable_profiling(app, args.profileDir)
+
+
+OPTIMIZER_PHASE_LATENCY = Histogram('optimizer_phase_duration_seconds',
+                                    'Time spent per optimizer phase: build, compile and solve the cvxpy problem',
+                                    ['phase'])
+OPTIMIZER_PROBLEM_ASSETS = Histogram('optimizer_problem_assets', 'Number of assets per optimizer problem',
+                                     buckets=(2, 5, 10, 20, 50, 100, 200, 500, 1000))
+
+# one row per instrument fed to the portfolio optimizer
+OPTIMIZER_DTYPE = np.dtype([
+    ('symbol', object),
+    ('beta', 'f8'),
+    ('dividend_yield', 'f8'),
+    ('expected_return', 'f8'),
+    ('std_dev', 'f8'),
+    ('pe_ratio', 'f8'),
+    ('capital', 'f8'),
+])
 
 
 @dataclass
@@ -90,42 +132,30 @@ def _parse_portfolio(portfolio: MarketData.Portfolio):
     min_yield = _parse_float(data_map, 'min_yield')
     new_cash = _parse_float(data_map, 'new_cash')
 
-    symbols, betas, yields, returns, std_devs, pe_ratios = [], [], [], [], [], []
-    total_capital = 0.0
-    current_holdings_dict = {}
-
+    rows = np.empty(len(imnts) - 1, dtype=OPTIMIZER_DTYPE)
     for i in range(1, len(imnts)):
         imnt = imnts[i]
-        symbol = imnt.ticker.symbol
-        beta = imnt.beta
-        div_yield = imnt.dividendYield
-
         data_map = imnt.metaData
-        imnt_return = _parse_float(data_map, 'return')
-        std_dev = _parse_float(data_map, 'std_dev')
-        pe_ratio = _parse_float(data_map, 'pe_ratio')
-
-        capital = imnt.ticker.data[0].price
-        total_capital += capital
-        current_holdings_dict[symbol] = capital
-
-        symbols.append(symbol)
-        betas.append(beta)
-        yields.append(div_yield)
-        returns.append(imnt_return)
-        std_devs.append(std_dev)
-        pe_ratios.append(pe_ratio)
-
+        rows[i - 1] = (imnt.ticker.symbol,
+                       imnt.beta,
+                       imnt.dividendYield,
+                       _parse_float(data_map, 'return'),
+                       _parse_float(data_map, 'std_dev'),
+                       _parse_float(data_map, 'pe_ratio'),
+                       imnt.ticker.data[0].price)
+
+    symbols = rows['symbol'].tolist()
+    current_holdings_dict = dict(zip(symbols, rows['capital'].tolist()))
     corr_matrix = _parse_correlation_matrix(portfolio.correlationMatrix, symbols)
 
     return PortfolioOptimizerParams(
-        total_capital_at_start=total_capital,
+        total_capital_at_start=float(rows['capital'].sum()),
         names=symbols,  # careful here
-        betas=np.array(betas),
-        yields=np.array(yields),
-        returns=np.array(returns),
-        std_devs=np.array(std_devs),
-        pe_ratios=np.array(pe_ratios),
+        betas=np.ascontiguousarray(rows['beta']),
+        yields=np.ascontiguousarray(rows['dividend_yield']),
+        returns=np.ascontiguousarray(rows['expected_return']),
+        std_devs=np.ascontiguousarray(rows['std_dev']),
+        pe_ratios=np.ascontiguousarray(rows['pe_ratio']),
         corr_matrix=corr_matrix,
         current_holdings_dict=current_holdings_dict,
         max_vol=max_vol,
@@ -186,6 +216,9 @@ def run_portfolio_optimizer(total_capital_at_start: float,
                             min_yield=.03,
                             new_cash=0.0,
                             objective_mode="MAX_RETURN"):
+    import cvxpy as cp
+    build_start = time.perf_counter()
+    OPTIMIZER_PROBLEM_ASSETS.observe(len(names))
     total_to_allocate = total_capital_at_start + new_cash
     D = np.diag(std_devs)
     covariance_matrix = D @ corr_matrix @ D
@@ -213,7 +246,16 @@ def run_portfolio_optimizer(total_capital_at_start: float,
     ]
 
     prob = cp.Problem(objective, constraints)
+    solve_start = time.perf_counter()
     prob.solve()
+    phases = {
+        'build': solve_start - build_start,
+        'compile': prob.compilation_time or 0.0,
+    }
+    phases['solve'] = time.perf_counter() - solve_start - phases['compile']
+    for phase, seconds in phases.items():
+        OPTIMIZER_PHASE_LATENCY.labels(phase).observe(seconds)
+        record_phase(f"cvxpy.{phase}", seconds)
 
     if prob.status == 'optimal':
         opt_w = weights.value
@@ -288,6 +330,20 @@ def run_portfolio_optimizer(total_capital_at_start: float,
         return json.dumps(error_resp)
 
 
+def optimize_portfolio(portfolio: MarketData.Portfolio) -> MarketData.Portfolio:
+    params = _parse_portfolio(portfolio)
+    if not params: raise ValueError("Cannot parse portfolio")
+    optimizer_result_json = run_portfolio_optimizer(**asdict(params))
+    return _parse_optimizer_json_to_portfolio(optimizer_result_json)
+
+
+@app.route('/ping', methods=['GET'])
+def ping():
+    timestamp = (int)(time.time() * 1000)
+    print(f"PINGING back with status {timestamp}")
+    return f"ALIVE-{timestamp}"
+
+
 @app.route('/calc/portfolio/optimizer', methods=['POST'])
 def portfolio_optimizer():
     data = request.get_data()
@@ -300,12 +356,37 @@ def portfolio_optimizer():
     except Exception as e:
         return jsonify({"error": f"Failed to parse protobuf: {str(e)}"}), 400
 
-    params = _parse_portfolio(portfolio)
-    optimizer_result_json = run_portfolio_optimizer(**asdict(params))
-    response_portfolio = _parse_optimizer_json_to_portfolio(optimizer_result_json)
+    try:
+        response_portfolio = optimize_portfolio(portfolio)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     return response_portfolio.SerializeToString(), 200, {'Content-Type': 'application/x-protobuf'}
 
 
+def grpc_optimize(portfolio, context):
+    import grpc
+    try:
+        return optimize_portfolio(portfolio)
+    except ValueError as e:
+        context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+
+
+def grpc_optimize_scenarios(portfolios, context):
+    # answers every scenario on the stream as soon as it is solved
+    for portfolio in portfolios:
+        yield grpc_optimize(portfolio, context)
+
+
+def start_grpc():
+    """
+    Serve PortfolioCalcService from mkt-data.proto over gRPC, sharing the handlers of the http routes.
+    """
+    serve_grpc('PortfolioCalcService', {
+        'Optimize': ('unary_unary', grpc_optimize, MarketData.Portfolio, MarketData.Portfolio),
+        'OptimizeScenarios': ('stream_stream', grpc_optimize_scenarios, MarketData.Portfolio, MarketData.Portfolio),
+    }, args.grpcPort)
+
+
 @app.route('/test', methods=['GET'])
 def test():
     current_holdings_dict = {
@@ -374,19 +455,14 @@ def test():
 
 
 if __name__ == '__main__':
+    configure()
     print(f"Using port: {args.port}")
 
-    if args.useEureka:
-        # Initialize the Eureka client
-        try:
-            print("Attempting registering onto eureka server")
-            eureka_client.init(
-                eureka_server="http://localhost:2012/eureka",
-                app_name="twm-calc-py-engine",
-                instance_port=args.port
-            )
-            print("Registered onto eureka server")
-        except Exception as e:
-            print("Failed to register onto eureka server ", e)
+    if is_serving_process():
+        warm_up('imports', import_modules('cvxpy'))
+        if args.useEureka:
+            warm_up('eureka', lambda: register_with_eureka('twm-calc-py-engine', args.port), required=False)
+        if args.grpcPort:
+            warm_up('grpc', start_grpc)
 
     app.run(host='0.0.0.0', port=args.port, debug=True)
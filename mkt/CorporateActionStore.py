@@ -0,0 +1,97 @@
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timedelta
+
+DIVIDEND = 'DIVIDEND'
+SPLIT = 'SPLIT'
+
+
+class CorporateActionStore:
+    """
+    Local incremental store of dividend and split history per symbol.
+    Remembers up to which date each symbol was last fetched so that only newer events are requested upstream.
+    """
+
+    def __init__(self, db_path: str) -> None:
+        self.db_path = db_path
+        with closing(self._connect()) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS corporate_action (
+                    symbol TEXT NOT NULL,
+                    event_date INTEGER NOT NULL,
+                    event_type TEXT NOT NULL,
+                    amount REAL NOT NULL,
+                    PRIMARY KEY (symbol, event_date, event_type)
+                )""")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS fetch_state (
+                    symbol TEXT PRIMARY KEY,
+                    last_fetched TEXT NOT NULL,
+                    last_close REAL
+                )""")
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def get_last_fetched(self, symbols: list[str]) -> dict[str, str]:
+        """
+        :return: symbol -> last fetched date (yyyy-mm-dd), only for symbols fetched before
+        """
+        if not symbols: return {}
+        placeholders = ','.join('?' * len(symbols))
+        with closing(self._connect()) as conn:
+            rows = conn.execute(f"SELECT symbol, last_fetched FROM fetch_state WHERE symbol IN ({placeholders})",
+                                symbols).fetchall()
+        return dict(rows)
+
+    def save(self, symbol: str, fetched_on: str, events: list[tuple[int, str, float]], last_close: float = None):
+        """
+        Persist newly fetched events for a symbol and move its fetch watermark forward.
+        :param events: list of (yyyyMMdd date, event type, amount)
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.executemany("INSERT OR REPLACE INTO corporate_action VALUES (?, ?, ?, ?)",
+                             [(symbol, event_date, event_type, amount) for event_date, event_type, amount in events])
+            conn.execute("""
+                INSERT INTO fetch_state VALUES (?, ?, ?)
+                ON CONFLICT(symbol) DO UPDATE SET
+                    last_fetched = excluded.last_fetched,
+                    last_close = COALESCE(excluded.last_close, fetch_state.last_close)
+                """, (symbol, fetched_on, last_close))
+
+    def get_events(self, symbols: list[str]) -> dict[str, list[tuple[int, str, float]]]:
+        """
+        :return: symbol -> list of (yyyyMMdd date, event type, amount), oldest first
+        """
+        events = {symbol: [] for symbol in symbols}
+        if not symbols: return events
+        placeholders = ','.join('?' * len(symbols))
+        with closing(self._connect()) as conn:
+            rows = conn.execute(f"""
+                SELECT symbol, event_date, event_type, amount FROM corporate_action
+                WHERE symbol IN ({placeholders}) ORDER BY symbol, event_date""", symbols).fetchall()
+        for symbol, event_date, event_type, amount in rows:
+            events[symbol].append((event_date, event_type, amount))
+        return events
+
+    def get_trailing_yield(self, symbols: list[str], as_of: datetime = None) -> dict[str, float]:
+        """
+        Trailing twelve month dividend yield computed from stored dividends and the last stored close.
+        :return: symbol -> yield as a fraction, 0.0 when no close is known
+        """
+        if not symbols: return {}
+        as_of = as_of or datetime.now()
+        since = int((as_of - timedelta(days=365)).strftime('%Y%m%d'))
+        placeholders = ','.join('?' * len(symbols))
+        with closing(self._connect()) as conn:
+            rows = conn.execute(f"""
+                SELECT f.symbol, f.last_close, COALESCE(SUM(c.amount), 0.0)
+                FROM fetch_state f
+                LEFT JOIN corporate_action c
+                    ON c.symbol = f.symbol AND c.event_type = ? AND c.event_date >= ?
+                WHERE f.symbol IN ({placeholders})
+                GROUP BY f.symbol""", [DIVIDEND, since, *symbols]).fetchall()
+        yields = {symbol: 0.0 for symbol in symbols}
+        for symbol, last_close, dividends in rows:
+            if last_close: yields[symbol] = dividends / last_close
+        return yields
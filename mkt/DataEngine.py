@@ -1,33 +1,55 @@
+import io
+import json
 import os
 import sys
 from datetime import datetime
 
-import pandas as pd
-import yfinance as yf
-from flask import Flask, request
+from flask import Flask, Response, request
 from flask_cors import CORS
-import py_eureka_client.eureka_client as eureka_client
 import argparse
 
-from Instrument import Instrument
+# yfinance, pandas, pyarrow, grpc and the eureka client are imported where used, warm-up loads them once serving
+from CorporateActionStore import CorporateActionStore, DIVIDEND, SPLIT
+from SharedCache import SharedCache
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from model.output import mkt_data_pb2 as MarketData
+from monitoring.Readiness import import_modules, instrument_readiness, warm_up
+from monitoring.RequestProfiler import enable_profiling
+from monitoring.ServiceMetrics import instrument_app, record_cache_lookup, upstream_call
+from monitoring.ServiceStartup import is_serving_process, register_with_eureka, serve_grpc
 
 # import model.output.mkt_data_pb2 as MarketData
 
 app = Flask(__name__)
 CORS(app)
+instrument_app(app)
+instrument_readiness(app)
 
 parser = argparse.ArgumentParser()
 parser.add_argument('--port', type=int, help='Port number to use', default=8083, required=False)
 parser.add_argument('--useEureka', type=bool, help='Use Eureka discovery?', default=False, required=False)
-args = parser.parse_args()
+parser.add_argument('--corporateActionsDb', type=str, help='SQLite file backing the corporate actions store',
+                    default='corporate-actions.db', required=False)
+parser.add_argument('--sharedCacheDb', type=str, default='mkt-cache.db', required=False,
+                    help='SQLite file backing the cache shared by all workers on the host')
+parser.add_argument('--grpcPort', type=int, help='Port to serve gRPC on, gRPC is off when not supplied',
+                    default=None, required=False)
+parser.add_argument('--profiling', type=bool, help='Allow profiling single requests with ?profile=1?',
+                    default=False, required=False)
+parser.add_argument('--profileDir', type=str, help='Directory keeping request profiles',
+                    default='profiles', required=False)
+args: argparse.Namespace = None
 
 start_date = '2016-10-18'
 end_date = '2023-10-10'
 
-ticker_name_map = {}
+# seconds entries stay in the shared cache
+ticker_metadata_ttl_seconds = 7 * 24 * 3600
+ticker_info_ttl_seconds = 24 * 3600
+history_ttl_seconds = 3600
+live_history_ttl_seconds = 60  # history reaching today, its last close still moves
+export_batch_rows = 4096  # rows per record batch of the arrow export stream
 country_code_map = {
     "CA": "TO",
     "US": "",
@@ -43,6 +65,63 @@ direction_map = {
     's': 'SELL'
 }
 
+corporate_action_store: CorporateActionStore = None
+shared_cache: SharedCache = None
+
+
+class InvalidArgument(ValueError):
+    pass
+
+
+def configure(argv: list[str] = None) -> Flask:
+    """
+    Parse the command line and set up what depends on it.
+    """
+    global args, corporate_action_store, shared_cache
+    args = parser.parse_args(argv)
+    corporate_action_store = CorporateActionStore(args.corporateActionsDb)
+    shared_cache = SharedCache(args.sharedCacheDb)
+    if args.profiling:
+        enable_profiling(app, args.profileDir)
+    return app
+
+
+def start_background():
+    """
+    Warm up, register onto eureka and serve gRPC next to the http server.
+    """
+    warm_up('imports', import_modules('pandas', 'yfinance', 'pyarrow.parquet', 'InstrumentTable'))
+    if args.useEureka:
+        warm_up('eureka', lambda: register_with_eureka('twm-market-data-engine', args.port), required=False)
+    if args.grpcPort:
+        # gRPC binds its port with SO_REUSEPORT, every worker serves it and the kernel spreads the calls
+        warm_up('grpc', start_grpc)
+
+
+def create_app(argv: list[str] = None) -> Flask:
+    """
+    App factory for running several workers, each configures itself and starts its own background steps, e.g.
+    gunicorn -c mkt/gunicorn.conf.py 'DataEngine:create_app(["--grpcPort", "9083"])'
+    """
+    configure(argv)
+    start_background()
+    return app
+
+
+@app.errorhandler(InvalidArgument)
+def invalid_argument(e):
+    return {'error': str(e)}, 400
+
+
+def get_use_original_symbol() -> bool:
+    """
+    :return: whether the request asks for its symbols as given, original=1 and the default, or with their exchange
+        suffix resolved from the country, original=0
+    """
+    original = request.args.get('original', '1')
+    if original not in ('0', '1'): raise InvalidArgument(f"original has to be 0 or 1, got {original!r}")
+    return original == '1'
+
 
 def get_symbol(symbol, country_code="CA"):
     return f"{symbol}.{stk_exchange_map.get(symbol, country_code_map.get(country_code, ""))}"
@@ -51,7 +130,9 @@ def get_symbol(symbol, country_code="CA"):
 def download_financial_data(symbol, start=start_date, end=end_date, country_code="CA", use_original_symbol=True):
     if not use_original_symbol: symbol = get_symbol(symbol, country_code)
     print(symbol)
-    data = yf.download(symbol, start=start, end=end)
+    import yfinance as yf
+    with upstream_call('yfinance', 'download'):
+        data = yf.download(symbol, start=start, end=end)
     # print(data)
     return data[["Close"]], symbol
 
@@ -60,6 +141,43 @@ def convert_to_date(dt: datetime):
     return dt.strftime("%Y-%m-%d")
 
 
+def fetch_corporate_actions(symbols: list[str]):
+    """
+    Pull dividend and split events newer than the last fetch of each symbol into the local store.
+    Symbols sharing the same watermark are downloaded together in a single upstream call.
+    """
+    today = convert_to_date(datetime.now())
+    last_fetched = corporate_action_store.get_last_fetched(symbols)
+    symbols_by_start = {}
+    for symbol in symbols:
+        start = last_fetched.get(symbol, start_date)
+        record_cache_lookup('corporate_actions', start == today)
+        if start == today: continue
+        symbols_by_start.setdefault(start, []).append(symbol)
+
+    for start, group in symbols_by_start.items():
+        print(f"Fetching corporate actions since {start} for {group}")
+        import yfinance as yf
+        with upstream_call('yfinance', 'actions'):
+            # columns keyed by ticker first whatever the number of symbols or the yfinance default
+            data = yf.download(group, start=start, actions=True, group_by='ticker', multi_level_index=True,
+                               auto_adjust=False, progress=False)
+        downloaded = set(data.columns.get_level_values(0))
+        for symbol in group:
+            if symbol not in downloaded: continue
+            frame = data[symbol]
+            closes = frame['Close'].dropna()
+            if closes.empty: continue  # failed download, keep the watermark where it was
+
+            events = []
+            for column, event_type in (('Dividends', DIVIDEND), ('Stock Splits', SPLIT)):
+                if column not in frame: continue
+                actions = frame[column]
+                for index, amount in actions[actions > 0].items():
+                    events.append((int(index.strftime('%Y%m%d')), event_type, float(amount)))
+            corporate_action_store.save(symbol, today, events, last_close=float(closes.iloc[-1]))
+
+
 def generate_proto_Ticker(symbol: str, name: str = "", sector: str = "", type: str = ""):
     ticker = MarketData.Ticker()
     ticker.symbol = symbol
@@ -81,24 +199,78 @@ def generate_proto_Portfolio():
     return MarketData.Portfolio()
 
 
-def generate_proto_Instrument(portfolio, imnt: Instrument, direction: str):
-    global ticker_name_map
-    imnt_proto = MarketData.Instrument()
-    imnt_proto.ticker.symbol = imnt.symbol
+def generate_proto_CorporateAction(event_date: int, event_type: str, amount: float):
+    corporate_action = MarketData.CorporateAction()
+    date = datetime.strptime(str(event_date), '%Y%m%d')
+    corporate_action.header = 'Dividend' if event_type == DIVIDEND else 'Stock Split'
+    corporate_action.message = f"Dividend of {amount}" if event_type == DIVIDEND else f"Stock split {amount}:1"
+    corporate_action.metaAmount = str(amount)
+    corporate_action.metaDate = convert_to_date(date)
+    corporate_action.metaEventType = event_type
+    return corporate_action
+
+
+def get_shared(cache: str, key: str, load, ttl_seconds: float) -> bytes:
+    """
+    Look a key up in the cache shared by all workers, loading and storing it on a miss.
+    :param load: returns the bytes and whether they may be cached, a failed upstream call is served but never cached
+    """
+    value, hit = shared_cache.get_or_load(cache, key, load, ttl_seconds)
+    record_cache_lookup(cache, hit)
+    return value
+
+
+def get_ticker_info(symbol: str) -> dict:
+    def load():
+        import yfinance as yf
+        with upstream_call('yfinance', 'info'):
+            info = yf.Ticker(symbol).info
+        # yfinance answers an unknown symbol or a failed lookup with an empty or partial info
+        return json.dumps(info).encode(), bool(info) and 'quoteType' in info
+
+    return json.loads(get_shared('ticker_info', symbol, load, ticker_info_ttl_seconds))
+
+
+def get_cached_ticker_name(symbol: str) -> str:
+    def load():
+        info = get_ticker_info(symbol)
+        # the symbol stands in for the name of a failed lookup until a later one finds it
+        return str(info.get('longName', symbol)).replace(",", "").encode(), 'longName' in info
+
+    return get_shared('ticker_name', symbol, load, ticker_metadata_ttl_seconds).decode()
+
 
-    if imnt_proto.ticker.symbol not in ticker_name_map:
-        ticker_name_map[imnt_proto.ticker.symbol] = get_ticker_name_without_country(imnt_proto.ticker.symbol)
-    ticker_name = ticker_name_map[imnt_proto.ticker.symbol]
+def get_cached_ticker_type(symbol: str) -> str:
+    def load():
+        info = get_ticker_info(symbol)
+        # EQUITY, the proto default, stands in for the type of a failed lookup until a later one finds it
+        return info.get('quoteType', 'EQUITY').encode(), 'quoteType' in info
 
-    imnt_proto.ticker.name = ticker_name
-    imnt_proto.ticker.sector = imnt.sector
-    imnt_proto.ticker.type = MarketData.InstrumentType.Value(imnt.type)
-    value_data = generate_proto_Value(imnt.dt, imnt.ticker_price)
-    imnt_proto.ticker.data.append(value_data)
-    imnt_proto.qty = imnt.qty
-    imnt_proto.accountType = MarketData.AccountType.Value(imnt.account)
-    imnt_proto.direction = MarketData.Direction.Value(direction)
-    portfolio.instruments.append(imnt_proto)
+    return get_shared('ticker_type', symbol, load, ticker_metadata_ttl_seconds).decode()
+
+
+def generate_proto_Portfolio_from_trades(trades, direction: str):
+    """
+    Convert the trade table into a Portfolio in one pass, resolving names and enum values once per distinct string.
+    :param trades: structured array of InstrumentTable.TRADE_DTYPE rows
+    """
+    portfolio = generate_proto_Portfolio()
+    direction_value = MarketData.Direction.Value(direction)
+    names = {symbol: get_cached_ticker_name(symbol) for symbol in set(trades['symbol'])}
+    types = {imnt_type: MarketData.InstrumentType.Value(imnt_type) for imnt_type in set(trades['type'])}
+    accounts = {account: MarketData.AccountType.Value(account) for account in set(trades['account'])}
+
+    for symbol, qty, date, price, sector, account, imnt_type in trades.tolist():
+        imnt_proto = portfolio.instruments.add()
+        imnt_proto.ticker.symbol = symbol
+        imnt_proto.ticker.name = names[symbol]
+        imnt_proto.ticker.sector = sector
+        imnt_proto.ticker.type = types[imnt_type]
+        imnt_proto.ticker.data.add(date=date, price=price)
+        imnt_proto.qty = qty
+        imnt_proto.accountType = accounts[account]
+        imnt_proto.direction = direction_value
+    return portfolio
 
 
 @app.route('/ping', methods=['GET'])
@@ -112,29 +284,25 @@ def ping():
 @app.route('/mkt/<country_code>/ticker/type/<symbol>', methods=['GET'])
 def get_ticker_type(country_code, symbol):
     # http://localhost:8083/mkt/CA/ticker/type/CCO
-    ticker = yf.Ticker(get_symbol(symbol, country_code))
-    return ticker.info['quoteType']
+    return get_ticker_info(get_symbol(symbol, country_code))['quoteType']
 
 
 @app.route('/mkt/ticker/type/<symbol>', methods=['GET'])
 def get_ticker_type_without_country(symbol):
     # http://localhost:8083/mkt/ticker/type/CCO
-    ticker = yf.Ticker(symbol)
-    return ticker.info['quoteType']
+    return get_ticker_info(symbol)['quoteType']
 
 
 @app.route('/mkt/<country_code>/ticker/name/<symbol>', methods=['GET'])
 def get_ticker_name(country_code, symbol):
     # http://localhost:8083/mkt/CA/ticker/name/CCO
-    ticker = yf.Ticker(get_symbol(symbol, country_code))
-    return str(ticker.info['longName']).replace(",", "")
+    return str(get_ticker_info(get_symbol(symbol, country_code))['longName']).replace(",", "")
 
 
 @app.route('/mkt/ticker/name/<symbol>', methods=['GET'])
 def get_ticker_name_without_country(symbol):
     # http://localhost:8083/mkt/ticker/name/CCO
-    ticker = yf.Ticker(symbol)
-    return str(ticker.info['longName']).replace(",", "")
+    return str(get_ticker_info(symbol)['longName']).replace(",", "")
 
 
 # @app.route('/proto/mkt/<country_code>/ticker/name/<symbol>', methods=['GET'])
@@ -150,31 +318,60 @@ def get_ticker_name_without_country(symbol):
 @app.route('/mkt/<country_code>/ticker/sector/<symbol>', methods=['GET'])
 def get_ticker_sector(country_code, symbol):
     # http://localhost:8083/mkt/CA/ticker/sector/CCO
-    return yf.Ticker(get_symbol(symbol, country_code)).info.get('sector', 'Unknown')
+    return get_ticker_info(get_symbol(symbol, country_code)).get('sector', 'Unknown')
 
 
 @app.route('/mkt/ticker/sector/<symbol>', methods=['GET'])
 def get_ticker_sector_without_country(symbol):
     # http://localhost:8083/mkt/ticker/sector/CCO.TO
-    return yf.Ticker(symbol).info.get('sector', 'Unknown')
+    return get_ticker_info(symbol).get('sector', 'Unknown')
 
 
 @app.route('/mkt/ticker/info/<symbol>', methods=['GET'])
 def get_ticker_info_without_country(symbol):
     # http://localhost:8083/mkt/ticker/sector/CCO.TO
-    return yf.Ticker(symbol).info
+    return get_ticker_info(symbol)
 
 
 @app.route('/mkt/<country_code>/ticker/dividend/<symbol>', methods=['GET'])
 def get_ticker_dividend(country_code, symbol) -> str:
     # http://localhost:8083/mkt/CA/ticker/dividend/CCO
-    return str(yf.Ticker(get_symbol(symbol, country_code)).info.get('dividendYield', '0.0'))
+    return str(get_ticker_info(get_symbol(symbol, country_code)).get('dividendYield', '0.0'))
 
 
 @app.route('/mkt/ticker/dividend/<symbol>', methods=['GET'])
 def get_ticker_dividend_without_country(symbol) -> str:
     # http://localhost:8083/mkt/ticker/dividend/CCO.TO
-    return str(yf.Ticker(symbol).info.get('dividendYield', '0.0'))
+    return str(get_ticker_info(symbol).get('dividendYield', '0.0'))
+
+
+@app.route('/proto/mkt/corporate-actions', methods=['GET'])
+def get_corporate_actions_proto():
+    """
+    GET dividend and split history along with the trailing twelve month dividend yield for many symbols at once.
+    Events are served from the local store, only events newer than the last fetch are requested upstream.
+    :return: proto based data Portfolio with one Instrument per symbol carrying dividendYield and corporateActions
+    """
+    # http://localhost:8083/proto/mkt/corporate-actions?symbols=CM.TO,ENB.TO&original=1
+    # http://localhost:8083/proto/mkt/corporate-actions?symbols=CM,ENB&country=CA&original=0
+    symbols = [symbol for symbol in request.args.get('symbols', '').split(',') if symbol]
+    country_code = request.args.get('country', 'CA')
+    use_original_symbol = get_use_original_symbol()
+    if not use_original_symbol: symbols = [get_symbol(symbol, country_code) for symbol in symbols]
+
+    fetch_corporate_actions(symbols)
+    events = corporate_action_store.get_events(symbols)
+    yields = corporate_action_store.get_trailing_yield(symbols)
+
+    portfolio = generate_proto_Portfolio()
+    for symbol in symbols:
+        imnt_proto = portfolio.instruments.add()
+        imnt_proto.ticker.symbol = symbol
+        imnt_proto.dividendYield = yields[symbol]
+        for event_date, event_type, amount in events[symbol]:
+            imnt_proto.corporateActions.append(generate_proto_CorporateAction(event_date, event_type, amount))
+
+    return portfolio.SerializeToString(), 200, {'Content-Type': 'application/x-protobuf'}
 
 
 # @app.route('/proto/mkt/<country_code>/ticker/sector/<symbol>', methods=['GET'])
@@ -196,7 +393,7 @@ def get_mkt_data():
     start = request.args.get('start')
     end = request.args.get('end')
     country_code = request.args.get('country', '')
-    use_original_symbol = int(request.args.get('original')) == 1
+    use_original_symbol = get_use_original_symbol()
     if country_code == '' and not use_original_symbol:
         country_ext = symbol[symbol.rindex('.') + 1:]
         for key in country_code_map.keys():
@@ -219,15 +416,10 @@ def get_mkt_data():
     }
 
 
-@app.route('/proto/mkt', methods=['GET'])
-def get_mkt_data_proto():
-    # http://localhost:8083/proto/mkt?symbol=CM.TO&start=2023-10-01&end=2023-10-09&original=1
-    symbol = request.args.get('symbol')
-    start = request.args.get('start')
-    end = request.args.get('end')
-    country_code = request.args.get('country', '')
-    use_original_symbol = int(request.args.get('original')) == 1
+def generate_proto_Ticker_history(symbol: str, start: str, end: str, country_code: str = '',
+                                  use_original_symbol: bool = True):
     if country_code == '' and not use_original_symbol:
+        if '.' not in symbol: raise ValueError(f"{symbol} carries no exchange suffix to strip")
         country_ext = symbol[symbol.rindex('.') + 1:]
         for key in country_code_map.keys():
             if country_ext == country_code_map[key]:
@@ -245,64 +437,182 @@ def get_mkt_data_proto():
                                    get_ticker_type_without_country(symbol))
     for index, row in data.iterrows(): ticker.data.append(
         generate_proto_Value(convert_to_date(index), row['Close']))
-    print(ticker)
+    return ticker
 
-    return ticker.SerializeToString(), 200, {'Content-Type': 'application/x-protobuf'}
+
+def get_cached_ticker_history(symbol: str, start: str, end: str, country_code: str = '',
+                              use_original_symbol: bool = True) -> bytes:
+    """
+    :return: serialized Ticker with the history, shared by all workers
+    """
+    def load():
+        ticker = generate_proto_Ticker_history(symbol, start, end, country_code, use_original_symbol)
+        print(ticker)
+        # yf.download answers a failed download with an empty frame instead of raising
+        return ticker.SerializeToString(), len(ticker.data) > 0
+
+    key = '|'.join((symbol, start or '', end or '', country_code, '1' if use_original_symbol else '0'))
+    ttl_seconds = history_ttl_seconds if end and end < convert_to_date(datetime.now()) else live_history_ttl_seconds
+    return get_shared('ticker_history', key, load, ttl_seconds)
+
+
+@app.route('/proto/mkt', methods=['GET'])
+def get_mkt_data_proto():
+    # http://localhost:8083/proto/mkt?symbol=CM.TO&start=2023-10-01&end=2023-10-09&original=1
+    try:
+        ticker = get_cached_ticker_history(request.args.get('symbol'),
+                                           request.args.get('start'),
+                                           request.args.get('end'),
+                                           request.args.get('country', ''),
+                                           use_original_symbol=get_use_original_symbol())
+    except ValueError as e:
+        return {'error': str(e)}, 400
+
+    return ticker, 200, {'Content-Type': 'application/x-protobuf'}
+
+
+def download_close_table(symbols: list[str], start: str, end: str):
+    """
+    Close prices of many symbols on one shared date index, as an arrow table with a date column and a float64 column
+    per symbol, built straight off the columns of the downloaded frame.
+    Bars a symbol has no close for are NaN rather than null, so every column loads into numpy without a copy.
+    """
+    import numpy as np
+    import pyarrow as pa
+    import yfinance as yf
+    with upstream_call('yfinance', 'download'):
+        data = yf.download(symbols, start=start, end=end, progress=False, multi_level_index=True)
+    closes = data['Close'] if 'Close' in data else data.iloc[:, :0]
+
+    dates = closes.index.values.astype('datetime64[D]')
+    columns = [pa.array(dates)]
+    for symbol in symbols:
+        values = closes[symbol].to_numpy(dtype='f8') if symbol in closes else np.full(len(dates), np.nan)
+        columns.append(pa.array(values))
+    return pa.Table.from_arrays(columns, names=['date', *symbols])
+
+
+def generate_arrow_stream(table):
+    # arrow ipc stream, handed out a record batch at a time
+    import pyarrow as pa
+    sink = io.BytesIO()
+
+    def drain() -> bytes:
+        chunk = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return chunk
+
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=export_batch_rows):
+            writer.write_batch(batch)
+            yield drain()
+    yield drain()
+
+
+def generate_parquet(table) -> bytes:
+    import pyarrow.parquet as pq
+    sink = io.BytesIO()
+    pq.write_table(table, sink)
+    return sink.getvalue()
+
+
+@app.route('/mkt/history/export', methods=['GET'])
+def export_history():
+    """
+    GET date aligned close prices of many symbols at once for notebooks and batch jobs.
+    :return: arrow ipc stream by default or a parquet file with format=parquet, a date column followed by a column of
+        closes per symbol. Read with pyarrow.ipc.open_stream(body).read_all().to_pandas(date_as_object=False)
+        or pandas.read_parquet()
+    """
+    # http://localhost:8083/mkt/history/export?symbols=CM.TO,ENB.TO&start=2016-10-18&end=2023-10-10&original=1
+    # http://localhost:8083/mkt/history/export?symbols=CM,ENB&country=CA&original=0&format=parquet
+    symbols = [symbol for symbol in request.args.get('symbols', '').split(',') if symbol]
+    country_code = request.args.get('country', 'CA')
+    use_original_symbol = get_use_original_symbol()
+    export_format = request.args.get('format', 'arrow')
+    if not symbols: return {'error': 'No symbols supplied'}, 400
+    if export_format not in ('arrow', 'parquet'): return {'error': f"Unsupported format {export_format}"}, 400
+    if not use_original_symbol: symbols = [get_symbol(symbol, country_code) for symbol in symbols]
+
+    table = download_close_table(list(dict.fromkeys(symbols)), request.args.get('start', start_date),
+                                 request.args.get('end', end_date))
+    if export_format == 'parquet':
+        return generate_parquet(table), 200, {'Content-Type': 'application/vnd.apache.parquet'}
+    return Response(generate_arrow_stream(table), mimetype='application/vnd.apache.arrow.stream')
 
 
 ## Only for CA
-@app.route('/proto/mkt/portfolio/<direction>', methods=['GET'])
-def get_mkt_portfolio_data(direction):
+def generate_mkt_portfolio(direction: str):
     """
-    GET market portfolio based on the direction supplied
     :param direction:
         - b: for getting data of stocks bought
         - s: for getting data of stocks sold
     :return: proto based data Portfolio from market data protobuf
     """
     exempt_ticker_in_data_source = ["Total invested"]
-    imnts = []
 
     import platform
+    import pandas as pd
+    from InstrumentTable import read_trades
     src_mkt_data = f"/var/mkt-data-{direction}.txt" if platform.system() == "Linux" else "C:\\mkt-data.txt"
     direction = direction_map[direction]
 
     data_source = pd.read_csv(open(src_mkt_data).readline())
-    for index, row in data_source.iterrows():
-        ticker = row['Stock code']
-        if type(ticker) == float or ticker in exempt_ticker_in_data_source: continue
-        qty = row['Qty']
-        dt = str(row['Trade date'])
-        ticker_price = float(row['Price per share'])
-        sector = str(row['Sector'])
-        account = str(row['Account'])
-        symbol = get_symbol(ticker)
-        imnt_type = get_ticker_type_without_country(symbol)
-        imnt = Instrument(symbol, qty, dt, ticker_price, sector, account, imnt_type)
-        print(imnt)
-        imnts.append(imnt)
+    trades = read_trades(data_source, get_symbol, get_cached_ticker_type, exempt_ticker_in_data_source)
+    portfolio = generate_proto_Portfolio_from_trades(trades, direction)
+    print(f"Portfolio of {len(trades)} {direction} trades across {len(set(trades['symbol']))} symbols")
+    return portfolio
 
-    portfolio = generate_proto_Portfolio()
-    [generate_proto_Instrument(portfolio, imnt, direction) for imnt in imnts]
-    print(portfolio)
 
+@app.route('/proto/mkt/portfolio/<direction>', methods=['GET'])
+def get_mkt_portfolio_data(direction):
+    """
+    GET market portfolio based on the direction supplied
+    :param direction:
+        - b: for getting data of stocks bought
+        - s: for getting data of stocks sold
+    :return: proto based data Portfolio from market data protobuf
+    """
+    portfolio = generate_mkt_portfolio(direction)
     return portfolio.SerializeToString(), 200, {'Content-Type': 'application/x-protobuf'}
 
 
+def grpc_get_history(history_request, context):
+    import grpc
+    # streams one Ticker per symbol as soon as its history is ready
+    for symbol in history_request.symbols:
+        try:
+            ticker = get_cached_ticker_history(symbol, history_request.start, history_request.end,
+                                               history_request.country,
+                                               use_original_symbol=not history_request.stripCountry)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        yield MarketData.Ticker.FromString(ticker)
+
+
+def grpc_get_portfolio(portfolio_request, context):
+    import grpc
+    if portfolio_request.direction not in direction_map:
+        context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"Unknown direction {portfolio_request.direction}")
+    return generate_mkt_portfolio(portfolio_request.direction)
+
+
+def start_grpc():
+    """
+    Serve MarketDataService from mkt-data.proto over gRPC, sharing the handlers of the http routes.
+    """
+    serve_grpc('MarketDataService', {
+        'GetHistory': ('unary_stream', grpc_get_history, MarketData.HistoryRequest, MarketData.Ticker),
+        'GetPortfolio': ('unary_unary', grpc_get_portfolio, MarketData.PortfolioRequest, MarketData.Portfolio),
+    }, args.grpcPort)
+
+
 if __name__ == '__main__':
+    configure()
     print(f"Using port: {args.port}")
 
-    if args.useEureka:
-        # Initialize the Eureka client
-        try:
-            print("Attempting registering onto eureka server")
-            eureka_client.init(
-                eureka_server="http://localhost:2012/eureka",
-                app_name="twm-market-data-engine",
-                instance_port=args.port
-            )
-            print("Registered onto eureka server")
-        except Exception as e:
-            print("Failed to register onto eureka server ", e)
+    if is_serving_process():
+        start_background()
 
     app.run(host='0.0.0.0', port=args.port, debug=True)
@@ -0,0 +1,61 @@
+import sys
+
+import numpy as np
+
+# one row per trade read off the market data csv, dates kept as yyyyMMdd ints like the proto Value
+TRADE_DTYPE = np.dtype([
+    ('symbol', object),
+    ('qty', 'f8'),
+    ('date', 'i4'),
+    ('price', 'f8'),
+    ('sector', object),
+    ('account', object),
+    ('type', object),
+])
+
+
+def interned(values) -> np.ndarray:
+    """
+    Object column where every distinct string is a single shared instance.
+    """
+    uniques, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    return np.array([sys.intern(str(value)) for value in uniques], dtype=object)[inverse]
+
+
+def to_yyyymmdd(dates) -> np.ndarray:
+    """
+    :param dates: iso formatted dates, yyyy-mm-dd
+    """
+    days = np.asarray(dates, dtype=str).astype('datetime64[D]')
+    months = days.astype('datetime64[M]')
+    years = months.astype('datetime64[Y]')
+    return ((years.astype('i4') + 1970) * 10000
+            + (months - years).astype('i4') * 100 + 100
+            + (days - months).astype('i4') + 1).astype('i4')
+
+
+def read_trades(data_source, symbol_of, type_of, exempt_tickers=()) -> np.ndarray:
+    """
+    Build the trade table column by column from the market data csv frame.
+    :param data_source: pandas frame with Stock code, Qty, Trade date, Price per share, Sector and Account columns
+    :param symbol_of: maps a stock code to its market symbol
+    :param type_of: maps a market symbol to its instrument type, called once per distinct symbol
+    :param exempt_tickers: stock codes to leave out, rows without a stock code are always left out
+    """
+    codes = data_source['Stock code']
+    # map keeps the dtype of an empty column, a str one does not combine with the bool mask
+    keep = codes.map(lambda code: not isinstance(code, float)).astype(bool) & ~codes.isin(list(exempt_tickers))
+    rows = data_source[keep]
+
+    trades = np.empty(len(rows), dtype=TRADE_DTYPE)
+    symbol_by_code = {code: sys.intern(symbol_of(code)) for code in rows['Stock code'].unique()}
+    trades['symbol'] = rows['Stock code'].map(symbol_by_code).to_numpy(dtype=object)
+    trades['qty'] = rows['Qty'].to_numpy(dtype='f8')
+    trades['date'] = to_yyyymmdd(rows['Trade date'].astype(str).to_numpy())
+    trades['price'] = rows['Price per share'].to_numpy(dtype='f8')
+    trades['sector'] = interned(rows['Sector'].astype(str).to_numpy())
+    trades['account'] = interned(rows['Account'].astype(str).to_numpy())
+
+    type_by_symbol = {symbol: sys.intern(type_of(symbol)) for symbol in symbol_by_code.values()}
+    trades['type'] = np.array([type_by_symbol[symbol] for symbol in trades['symbol']], dtype=object)
+    return trades
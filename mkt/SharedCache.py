@@ -0,0 +1,124 @@
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+
+class SharedCache:
+    """
+    Key-value cache in a SQLite file in WAL mode, shared by every worker process of the service on the host.
+    Entries expire after their ttl and the least recently read ones are evicted past max_entries.
+    A miss takes a short lease on its key so that only one worker loads it from upstream while the others wait.
+    """
+
+    def __init__(self, db_path: str, max_entries: int = 20000, lease_seconds: float = 30,
+                 touch_seconds: float = 60, evict_every: int = 100) -> None:
+        """
+        :param touch_seconds: how stale the last read time of an entry gets before a read refreshes it, keeps reads
+            from taking the write lock every time
+        :param evict_every: puts made by this process between two eviction passes
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.lease_seconds = lease_seconds
+        self.touch_seconds = touch_seconds
+        self.evict_every = evict_every
+        self._puts = 0
+        self._puts_lock = threading.Lock()
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_entry (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_read REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_entry_last_read ON cache_entry (last_read)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_lease (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )""")
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def get(self, namespace: str, key: str) -> bytes | None:
+        now = time.time()
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT value, expires_at, last_read FROM cache_entry WHERE namespace = ? AND key = ?",
+                               (namespace, key)).fetchone()
+            if not row or row[1] < now: return None
+            value, _, last_read = row
+            if now - last_read > self.touch_seconds:
+                with conn:
+                    conn.execute("UPDATE cache_entry SET last_read = ? WHERE namespace = ? AND key = ?",
+                                 (now, namespace, key))
+        return value
+
+    def put(self, namespace: str, key: str, value: bytes, ttl_seconds: float):
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute("INSERT OR REPLACE INTO cache_entry VALUES (?, ?, ?, ?, ?)",
+                         (namespace, key, value, now + ttl_seconds, now))
+        with self._puts_lock:
+            self._puts += 1
+            evict = self._puts % self.evict_every == 0
+        if evict: self.evict()
+
+    def evict(self):
+        """
+        Drop expired entries and leases, then the least recently read entries beyond max_entries.
+        """
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM cache_entry WHERE expires_at < ?", (now,))
+            conn.execute("DELETE FROM cache_lease WHERE expires_at < ?", (now,))
+            conn.execute("""
+                DELETE FROM cache_entry WHERE rowid IN (
+                    SELECT rowid FROM cache_entry ORDER BY last_read DESC LIMIT -1 OFFSET ?)""", (self.max_entries,))
+
+    def _acquire_lease(self, namespace: str, key: str) -> bool:
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM cache_lease WHERE namespace = ? AND key = ? AND expires_at < ?",
+                         (namespace, key, now))
+            return conn.execute("INSERT OR IGNORE INTO cache_lease VALUES (?, ?, ?)",
+                                (namespace, key, now + self.lease_seconds)).rowcount == 1
+
+    def _release_lease(self, namespace: str, key: str):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM cache_lease WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def get_or_load(self, namespace: str, key: str, load, ttl_seconds: float,
+                    poll_seconds: float = 0.05) -> tuple[bytes, bool]:
+        """
+        :param load: called on a miss, returns the value and whether it may be cached, e.g. not when the upstream call
+            failed without raising
+        :return: the value and whether it came from the cache
+        """
+        value = self.get(namespace, key)
+        if value is not None: return value, True
+
+        deadline = time.time() + self.lease_seconds
+        leased = self._acquire_lease(namespace, key)
+        while not leased:
+            # another worker is loading this key, take its result unless it runs past the lease
+            time.sleep(poll_seconds)
+            value = self.get(namespace, key)
+            if value is not None: return value, True
+            if time.time() > deadline: break
+            leased = self._acquire_lease(namespace, key)
+        try:
+            value = self.get(namespace, key) if leased else None  # the previous holder may have just stored it
+            if value is not None: return value, True
+            value, cacheable = load()
+            if cacheable: self.put(namespace, key, value, ttl_seconds)
+            return value, False
+        finally:
+            if leased: self._release_lease(namespace, key)
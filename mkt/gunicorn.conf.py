@@ -0,0 +1,20 @@
+import os
+import tempfile
+
+# Runs DataEngine with several workers: gunicorn -c mkt/gunicorn.conf.py
+# Arguments go to the factory, e.g. 'DataEngine:create_app(["--grpcPort", "9083"])' after the config, keep --port
+# in line with bind as it is what eureka is told.
+
+# every worker writes its metrics here so any of them answers /metrics for all, set before the workers import
+# prometheus_client
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', tempfile.mkdtemp(prefix='twm-market-data-metrics-'))
+
+chdir = os.path.dirname(os.path.abspath(__file__))
+wsgi_app = 'DataEngine:create_app([])'
+bind = '0.0.0.0:8083'
+workers = 4
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
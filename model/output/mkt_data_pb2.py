@@ -2,17 +2,18 @@
 # Generated by the protocol buffer compiler.  DO NOT EDIT!
 # source: mkt-data.proto
 """Generated protocol buffer code."""
+from google.protobuf.internal import builder as _builder
 from google.protobuf import descriptor as _descriptor
 from google.protobuf import descriptor_pool as _descriptor_pool
 from google.protobuf import symbol_database as _symbol_database
-from google.protobuf.internal import builder as _builder
-
 # @@protoc_insertion_point(imports)
 
 _sym_db = _symbol_database.Default()
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(
-  b'\n\x0emkt-data.proto\"k\n\x06Ticker\x12\x0e\n\x06symbol\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\x0e\n\x06sector\x18\x03 \x01(\t\x12\x1d\n\x04type\x18\x04 \x01(\x0e\x32\x0f.InstrumentType\x12\x14\n\x04\x64\x61ta\x18\x05 \x03(\x0b\x32\x06.Value\"$\n\x05Value\x12\x0c\n\x04\x64\x61te\x18\x01 \x01(\x05\x12\r\n\x05price\x18\x02 \x01(\x01\"Y\n\nInvestment\x12\x17\n\x06ticker\x18\x01 \x01(\x0b\x32\x07.Ticker\x12\x0b\n\x03qty\x18\x02 \x01(\x01\x12!\n\x0b\x61\x63\x63ountType\x18\x03 \x01(\x0e\x32\x0c.AccountType:\x02\x18\x01\"\xef\x03\n\nInstrument\x12\x17\n\x06ticker\x18\x01 \x01(\x0b\x32\x07.Ticker\x12\x0b\n\x03qty\x18\x02 \x01(\x01\x12!\n\x0b\x61\x63\x63ountType\x18\x03 \x01(\x0e\x32\x0c.AccountType\x12\x1d\n\tdirection\x18\x04 \x01(\x0e\x32\n.Direction\x12+\n\x08metaData\x18\x05 \x03(\x0b\x32\x19.Instrument.MetaDataEntry\x12\x0e\n\x06userId\x18\x06 \x01(\t\x12\x17\n\x06signal\x18\x07 \x01(\x0e\x32\x07.Signal\x12\x15\n\rdividendYield\x18\x08 \x01(\x01\x12\x0b\n\x03mer\x18\t \x01(\x01\x12\r\n\x05notes\x18\n \x01(\t\x12\x1e\n\x0cissueCountry\x18\x0b \x01(\x0e\x32\x08.Country\x12\x1f\n\roriginCountry\x18\x0c \x01(\x0e\x32\x08.Country\x12\x1a\n\x03\x63\x63y\x18\r \x01(\x0e\x32\r.CurrencyCode\x12*\n\x10\x63orporateActions\x18\x0e \x03(\x0b\x32\x10.CorporateAction\x12(\n\x0f\x63ompanyOfficers\x18\x0f \x03(\x0b\x32\x0f.CompanyOfficer\x12\x0c\n\x04\x62\x65ta\x18\x10 \x01(\x01\x1a/\n\rMetaDataEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"\xad\x01\n\tPortfolio\x12$\n\x0binvestments\x18\x01 \x03(\x0b\x32\x0b.InvestmentB\x02\x18\x01\x12 \n\x0binstruments\x18\x02 \x03(\x0b\x32\x0b.Instrument\x12\x0e\n\x06userId\x18\x03 \x01(\t\x12\x32\n\x11\x63orrelationMatrix\x18\x04 \x01(\x0b\x32\x12.CorrelationMatrixH\x00\x88\x01\x01\x42\x14\n\x12_correlationMatrix\"6\n\x11\x43orrelationMatrix\x12!\n\x07\x65ntries\x18\x01 \x03(\x0b\x32\x10.CorrelationCell\"B\n\x0f\x43orrelationCell\x12\x0f\n\x07imntRow\x18\x01 \x01(\t\x12\x0f\n\x07imntCol\x18\x02 \x01(\t\x12\r\n\x05value\x18\x03 \x01(\x01\"o\n\x0f\x43orporateAction\x12\x0e\n\x06header\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x12\n\nmetaAmount\x18\x03 \x01(\t\x12\x10\n\x08metaDate\x18\x04 \x01(\t\x12\x15\n\rmetaEventType\x18\x05 \x01(\t\"`\n\x0e\x43ompanyOfficer\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\r\n\x05title\x18\x02 \x01(\t\x12\x10\n\x08totalPay\x18\x03 \x01(\t\x12\x12\n\nfiscalYear\x18\x04 \x01(\t\x12\x0b\n\x03\x61ge\x18\x05 \x01(\t*\x1e\n\tDirection\x12\x07\n\x03\x42UY\x10\x00\x12\x08\n\x04SELL\x10\x01*<\n\x0b\x41\x63\x63ountType\x12\x08\n\x04TFSA\x10\x00\x12\x06\n\x02NR\x10\x01\x12\x08\n\x04\x46HSA\x10\x02\x12\x08\n\x04RRSP\x10\x03\x12\x07\n\x03IND\x10\x04*z\n\x0eInstrumentType\x12\n\n\x06\x45QUITY\x10\x00\x12\t\n\x05INDEX\x10\x01\x12\x07\n\x03\x45TF\x10\x02\x12\x0e\n\nMUTUALFUND\x10\x03\x12\n\n\x06\x46UTURE\x10\x04\x12\x0c\n\x08\x43URRENCY\x10\x05\x12\x12\n\x0e\x43RYPTOCURRENCY\x10\x06\x12\n\n\x06OPTION\x10\x07*Z\n\x06Signal\x12\x0c\n\x08SIG_HOLD\x10\x00\x12\x0b\n\x07SIG_BUY\x10\x01\x12\x12\n\x0eSIG_STRONG_BUY\x10\x02\x12\x0c\n\x08SIG_SELL\x10\x03\x12\x13\n\x0fSIG_STRONG_SELL\x10\x04*-\n\x07\x43ountry\x12\x06\n\x02\x43\x41\x10\x00\x12\x06\n\x02IN\x10\x01\x12\x06\n\x02US\x10\x02\x12\n\n\x06GLOBAL\x10\x03*)\n\x0c\x43urrencyCode\x12\x07\n\x03\x43\x41\x44\x10\x00\x12\x07\n\x03INR\x10\x01\x12\x07\n\x03USD\x10\x02\x62\x06proto3')
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0emkt-data.proto\"k\n\x06Ticker\x12\x0e\n\x06symbol\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\x0e\n\x06sector\x18\x03 \x01(\t\x12\x1d\n\x04type\x18\x04 \x01(\x0e\x32\x0f.InstrumentType\x12\x14\n\x04\x64\x61ta\x18\x05 \x03(\x0b\x32\x06.Value\"$\n\x05Value\x12\x0c\n\x04\x64\x61te\x18\x01 \x01(\x05\x12\r\n\x05price\x18\x02 \x01(\x01\"Y\n\nInvestment\x12\x17\n\x06ticker\x18\x01 \x01(\x0b\x32\x07.Ticker\x12\x0b\n\x03qty\x18\x02 \x01(\x01\x12!\n\x0b\x61\x63\x63ountType\x18\x03 \x01(\x0e\x32\x0c.AccountType:\x02\x18\x01\"\xef\x03\n\nInstrument\x12\x17\n\x06ticker\x18\x01 \x01(\x0b\x32\x07.Ticker\x12\x0b\n\x03qty\x18\x02 \x01(\x01\x12!\n\x0b\x61\x63\x63ountType\x18\x03 \x01(\x0e\x32\x0c.AccountType\x12\x1d\n\tdirection\x18\x04 \x01(\x0e\x32\n.Direction\x12+\n\x08metaData\x18\x05 \x03(\x0b\x32\x19.Instrument.MetaDataEntry\x12\x0e\n\x06userId\x18\x06 \x01(\t\x12\x17\n\x06signal\x18\x07 \x01(\x0e\x32\x07.Signal\x12\x15\n\rdividendYield\x18\x08 \x01(\x01\x12\x0b\n\x03mer\x18\t \x01(\x01\x12\r\n\x05notes\x18\n \x01(\t\x12\x1e\n\x0cissueCountry\x18\x0b \x01(\x0e\x32\x08.Country\x12\x1f\n\roriginCountry\x18\x0c \x01(\x0e\x32\x08.Country\x12\x1a\n\x03\x63\x63y\x18\r \x01(\x0e\x32\r.CurrencyCode\x12*\n\x10\x63orporateActions\x18\x0e \x03(\x0b\x32\x10.CorporateAction\x12(\n\x0f\x63ompanyOfficers\x18\x0f \x03(\x0b\x32\x0f.CompanyOfficer\x12\x0c\n\x04\x62\x65ta\x18\x10 \x01(\x01\x1a/\n\rMetaDataEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"\xad\x01\n\tPortfolio\x12$\n\x0binvestments\x18\x01 \x03(\x0b\x32\x0b.InvestmentB\x02\x18\x01\x12 \n\x0binstruments\x18\x02 \x03(\x0b\x32\x0b.Instrument\x12\x0e\n\x06userId\x18\x03 \x01(\t\x12\x32\n\x11\x63orrelationMatrix\x18\x04 \x01(\x0b\x32\x12.CorrelationMatrixH\x00\x88\x01\x01\x42\x14\n\x12_correlationMatrix\"6\n\x11\x43orrelationMatrix\x12!\n\x07\x65ntries\x18\x01 \x03(\x0b\x32\x10.CorrelationCell\"B\n\x0f\x43orrelationCell\x12\x0f\n\x07imntRow\x18\x01 \x01(\t\x12\x0f\n\x07imntCol\x18\x02 \x01(\t\x12\r\n\x05value\x18\x03 \x01(\x01\"o\n\x0f\x43orporateAction\x12\x0e\n\x06header\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x12\n\nmetaAmount\x18\x03 \x01(\t\x12\x10\n\x08metaDate\x18\x04 \x01(\t\x12\x15\n\rmetaEventType\x18\x05 \x01(\t\"`\n\x0e\x43ompanyOfficer\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\r\n\x05title\x18\x02 \x01(\t\x12\x10\n\x08totalPay\x18\x03 \x01(\t\x12\x12\n\nfiscalYear\x18\x04 \x01(\t\x12\x0b\n\x03\x61ge\x18\x05 \x01(\t\"d\n\x0eHistoryRequest\x12\x0f\n\x07symbols\x18\x01 \x03(\t\x12\r\n\x05start\x18\x02 \x01(\t\x12\x0b\n\x03\x65nd\x18\x03 \x01(\t\x12\x0f\n\x07\x63ountry\x18\x04 \x01(\t\x12\x14\n\x0cstripCountry\x18\x05 \x01(\x08\"%\n\x10PortfolioRequest\x12\x11\n\tdirection\x18\x01 \x01(\t*\x1e\n\tDirection\x12\x07\n\x03\x42UY\x10\x00\x12\x08\n\x04SELL\x10\x01*<\n\x0b\x41\x63\x63ountType\x12\x08\n\x04TFSA\x10\x00\x12\x06\n\x02NR\x10\x01\x12\x08\n\x04\x46HSA\x10\x02\x12\x08\n\x04RRSP\x10\x03\x12\x07\n\x03IND\x10\x04*z\n\x0eInstrumentType\x12\n\n\x06\x45QUITY\x10\x00\x12\t\n\x05INDEX\x10\x01\x12\x07\n\x03\x45TF\x10\x02\x12\x0e\n\nMUTUALFUND\x10\x03\x12\n\n\x06\x46UTURE\x10\x04\x12\x0c\n\x08\x43URRENCY\x10\x05\x12\x12\n\x0e\x43RYPTOCURRENCY\x10\x06\x12\n\n\x06OPTION\x10\x07*Z\n\x06Signal\x12\x0c\n\x08SIG_HOLD\x10\x00\x12\x0b\n\x07SIG_BUY\x10\x01\x12\x12\n\x0eSIG_STRONG_BUY\x10\x02\x12\x0c\n\x08SIG_SELL\x10\x03\x12\x13\n\x0fSIG_STRONG_SELL\x10\x04*-\n\x07\x43ountry\x12\x06\n\x02\x43\x41\x10\x00\x12\x06\n\x02IN\x10\x01\x12\x06\n\x02US\x10\x02\x12\n\n\x06GLOBAL\x10\x03*)\n\x0c\x43urrencyCode\x12\x07\n\x03\x43\x41\x44\x10\x00\x12\x07\n\x03INR\x10\x01\x12\x07\n\x03USD\x10\x02\x32l\n\x11MarketDataService\x12(\n\nGetHistory\x12\x0f.HistoryRequest\x1a\x07.Ticker0\x01\x12-\n\x0cGetPortfolio\x12\x11.PortfolioRequest\x1a\n.Portfolio2k\n\x14PortfolioCalcService\x12\"\n\x08Optimize\x12\n.Portfolio\x1a\n.Portfolio\x12/\n\x11OptimizeScenarios\x12\n.Portfolio\x1a\n.Portfolio(\x01\x30\x01\x62\x06proto3')
 
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, globals())
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'mkt_data_pb2', globals())
@@ -25,18 +26,18 @@ if _descriptor._USE_C_DESCRIPTORS == False:
   _INSTRUMENT_METADATAENTRY._serialized_options = b'8\001'
   _PORTFOLIO.fields_by_name['investments']._options = None
   _PORTFOLIO.fields_by_name['investments']._serialized_options = b'\030\001'
-  _DIRECTION._serialized_start = 1265
-  _DIRECTION._serialized_end = 1295
-  _ACCOUNTTYPE._serialized_start = 1297
-  _ACCOUNTTYPE._serialized_end = 1357
-  _INSTRUMENTTYPE._serialized_start = 1359
-  _INSTRUMENTTYPE._serialized_end = 1481
-  _SIGNAL._serialized_start = 1483
-  _SIGNAL._serialized_end = 1573
-  _COUNTRY._serialized_start = 1575
-  _COUNTRY._serialized_end = 1620
-  _CURRENCYCODE._serialized_start = 1622
-  _CURRENCYCODE._serialized_end = 1663
+  _DIRECTION._serialized_start=1406
+  _DIRECTION._serialized_end=1436
+  _ACCOUNTTYPE._serialized_start=1438
+  _ACCOUNTTYPE._serialized_end=1498
+  _INSTRUMENTTYPE._serialized_start=1500
+  _INSTRUMENTTYPE._serialized_end=1622
+  _SIGNAL._serialized_start=1624
+  _SIGNAL._serialized_end=1714
+  _COUNTRY._serialized_start=1716
+  _COUNTRY._serialized_end=1761
+  _CURRENCYCODE._serialized_start=1763
+  _CURRENCYCODE._serialized_end=1804
   _TICKER._serialized_start=18
   _TICKER._serialized_end=125
   _VALUE._serialized_start=127
@@ -47,14 +48,22 @@ if _descriptor._USE_C_DESCRIPTORS == False:
   _INSTRUMENT._serialized_end=752
   _INSTRUMENT_METADATAENTRY._serialized_start=705
   _INSTRUMENT_METADATAENTRY._serialized_end=752
-  _PORTFOLIO._serialized_start = 755
-  _PORTFOLIO._serialized_end = 928
-  _CORRELATIONMATRIX._serialized_start = 930
-  _CORRELATIONMATRIX._serialized_end = 984
-  _CORRELATIONCELL._serialized_start = 986
-  _CORRELATIONCELL._serialized_end = 1052
-  _CORPORATEACTION._serialized_start = 1054
-  _CORPORATEACTION._serialized_end = 1165
-  _COMPANYOFFICER._serialized_start = 1167
-  _COMPANYOFFICER._serialized_end = 1263
+  _PORTFOLIO._serialized_start=755
+  _PORTFOLIO._serialized_end=928
+  _CORRELATIONMATRIX._serialized_start=930
+  _CORRELATIONMATRIX._serialized_end=984
+  _CORRELATIONCELL._serialized_start=986
+  _CORRELATIONCELL._serialized_end=1052
+  _CORPORATEACTION._serialized_start=1054
+  _CORPORATEACTION._serialized_end=1165
+  _COMPANYOFFICER._serialized_start=1167
+  _COMPANYOFFICER._serialized_end=1263
+  _HISTORYREQUEST._serialized_start=1265
+  _HISTORYREQUEST._serialized_end=1365
+  _PORTFOLIOREQUEST._serialized_start=1367
+  _PORTFOLIOREQUEST._serialized_end=1404
+  _MARKETDATASERVICE._serialized_start=1806
+  _MARKETDATASERVICE._serialized_end=1914
+  _PORTFOLIOCALCSERVICE._serialized_start=1916
+  _PORTFOLIOCALCSERVICE._serialized_end=2023
 # @@protoc_insertion_point(module_scope)
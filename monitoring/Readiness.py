@@ -0,0 +1,71 @@
+import importlib
+import threading
+import time
+
+_started = time.perf_counter()
+_steps = {}
+_steps_lock = threading.Lock()
+_watches = {}
+
+
+def import_modules(*modules: str):
+    """
+    Warm-up task importing heavy modules ahead of the first request that needs them, e.g. warm_up('imports',
+    import_modules('pandas', 'yfinance')). Code using them keeps importing them where needed, which then is a lookup.
+    Services import heavy modules only where used and parse their command line in configure() rather than at module
+    load, so importing one stays cheap.
+    """
+    return lambda: [importlib.import_module(module) for module in modules]
+
+
+def warm_up(name: str, task, required: bool = True):
+    """
+    Run a startup task in the background so the server binds and answers /ping right away.
+    :param required: whether /ready waits on the task, a failed required task keeps the service unready
+    """
+    with _steps_lock:
+        _steps[name] = {'state': 'pending', 'required': required}
+
+    def _run():
+        start = time.perf_counter()
+        try:
+            task()
+            outcome = {'state': 'ready'}
+        except Exception as e:
+            print(f"Warm-up step {name} failed ", e)
+            outcome = {'state': 'failed', 'error': str(e)}
+        with _steps_lock:
+            _steps[name].update(outcome, seconds=round(time.perf_counter() - start, 3),
+                                at=round(time.perf_counter() - _started, 3))
+
+    threading.Thread(target=_run, name=f"warm-up-{name}", daemon=True).start()
+
+
+def watch(name: str, check, required: bool = True):
+    """
+    Check a long running part of the service, e.g. a background worker, on every /ready.
+    :param check: returns None while healthy and what is wrong otherwise
+    :param required: whether /ready fails while the check does
+    """
+    with _steps_lock:
+        _watches[name] = (check, required)
+
+
+def instrument_readiness(app):
+    """
+    Expose /ready, answering 200 once every required warm-up step is done and every required watch is healthy, 503
+    otherwise.
+    """
+
+    @app.route('/ready', methods=['GET'])
+    def ready():
+        with _steps_lock:
+            steps = {name: dict(step) for name, step in _steps.items()}
+            watches = dict(_watches)
+        for name, (check, required) in watches.items():
+            error = check()
+            steps[name] = {'state': 'ready', 'required': required} if error is None else \
+                {'state': 'failed', 'required': required, 'error': error}
+        ready = all(step['state'] == 'ready' for step in steps.values() if step['required'])
+        return {'ready': ready, 'uptime': round(time.perf_counter() - _started, 3), 'steps': steps}, \
+            200 if ready else 503
@@ -0,0 +1,142 @@
+import cProfile
+import json
+import os
+import pstats
+import sysconfig
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+from flask import g, request, send_file
+
+_enabled = False
+_profiler_lock = threading.Lock()  # the interpreter supports a single active cProfile at a time
+_active = threading.local()
+_stdlib = sysconfig.get_paths()['stdlib']
+
+
+def record_phase(phase: str, seconds: float):
+    """
+    Add time spent in a named phase (provider call, solver step, ...) to the profile of the current request, if any.
+    """
+    if not _enabled: return
+    phases = getattr(_active, 'phases', None)
+    if phases is not None:
+        phases[phase] += seconds
+
+
+def _package_of(filename: str) -> str:
+    parts = filename.replace('\\', '/').split('/')
+    if 'site-packages' in parts:
+        package = parts[parts.index('site-packages') + 1]
+        return 'google.protobuf' if package == 'google' and 'protobuf' in parts else package
+    if filename.startswith('<') or filename == '~':
+        return 'builtins'
+    return 'stdlib' if filename.startswith(_stdlib) else 'app'
+
+
+def _summarize(stats: pstats.Stats, top: int = 25) -> tuple[list, list]:
+    """
+    :return: self time per package, so e.g. pandas conversion, protobuf serialization and cvxpy show up side by side,
+        along with the functions with the highest cumulative time
+    """
+    packages = defaultdict(float)
+    functions = []
+    for (filename, line, name), (_, calls, self_time, cumulative, _) in stats.stats.items():
+        packages[_package_of(filename)] += self_time
+        functions.append({'function': f"{filename}:{line}({name})", 'calls': calls,
+                          'self': round(self_time, 6), 'cumulative': round(cumulative, 6)})
+    functions.sort(key=lambda function: function['cumulative'], reverse=True)
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True), functions[:top]
+
+
+def enable_profiling(app, profile_dir: str, max_profiles: int = 50):
+    """
+    Profile single requests on demand, asked for with ?profile=1 or the X-Profile: 1 header.
+    Only call when profiling is configured on, nothing gets hooked into the app otherwise.
+    Profiles are kept in profile_dir and served from /admin/profiles.
+    """
+    global _enabled
+    _enabled = True
+    os.makedirs(profile_dir, exist_ok=True)
+
+    def _requested():
+        return request.args.get('profile') == '1' or request.headers.get('X-Profile') == '1'
+
+    @app.before_request
+    def _start_profile():
+        if not _requested() or not _profiler_lock.acquire(blocking=False): return
+        g.profiler = cProfile.Profile()
+        g.profile_start = time.perf_counter()
+        _active.phases = defaultdict(float)
+        g.profiler.enable()
+
+    @app.after_request
+    def _stop_profile(response):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            if _requested(): response.headers['X-Profile-Skipped'] = 'another request is being profiled'
+            return response
+        try:
+            profiler.disable()
+            duration = time.perf_counter() - g.profile_start
+            profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+            profiler.dump_stats(os.path.join(profile_dir, f"{profile_id}.prof"))
+            packages, functions = _summarize(pstats.Stats(profiler))
+            summary = {
+                'id': profile_id,
+                'route': request.path,
+                'query': request.query_string.decode(),
+                'status': response.status_code,
+                'duration': round(duration, 6),
+                'phases': {phase: round(seconds, 6) for phase, seconds in _active.phases.items()},
+                'packages': [{'package': package, 'self': round(seconds, 6)} for package, seconds in packages],
+                'top_functions': functions,
+            }
+            with open(os.path.join(profile_dir, f"{profile_id}.json"), 'w') as summary_file:
+                json.dump(summary, summary_file)
+            response.headers['X-Profile-Id'] = profile_id
+        finally:
+            _active.phases = None
+            _profiler_lock.release()
+        _prune(profile_dir, max_profiles)
+        return response
+
+    @app.teardown_request
+    def _release_profile(exception=None):
+        # after_request is skipped when the handler raised, don't leave the profiler running
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.disable()
+            _active.phases = None
+            _profiler_lock.release()
+
+    @app.route('/admin/profiles', methods=['GET'])
+    def list_profiles():
+        summaries = []
+        for name in sorted(os.listdir(profile_dir), reverse=True):
+            if not name.endswith('.json'): continue
+            with open(os.path.join(profile_dir, name)) as summary_file:
+                summary = json.load(summary_file)
+            summaries.append({key: summary[key] for key in ('id', 'route', 'status', 'duration')})
+        return summaries, 200
+
+    @app.route('/admin/profiles/<profile_id>', methods=['GET'])
+    def get_profile(profile_id):
+        # json summary by default, ?format=prof downloads the raw cProfile dump for snakeviz / pstats
+        path = os.path.join(os.path.abspath(profile_dir), os.path.basename(profile_id))
+        if request.args.get('format') == 'prof':
+            if not os.path.exists(f"{path}.prof"): return {'error': f"No profile {profile_id}"}, 404
+            return send_file(f"{path}.prof", mimetype='application/octet-stream', as_attachment=True)
+        if not os.path.exists(f"{path}.json"): return {'error': f"No profile {profile_id}"}, 404
+        with open(f"{path}.json") as summary_file:
+            return json.load(summary_file), 200
+
+
+def _prune(profile_dir: str, max_profiles: int):
+    summaries = sorted(name for name in os.listdir(profile_dir) if name.endswith('.json'))
+    for name in summaries[:-max_profiles]:
+        for extension in ('.json', '.prof'):
+            path = os.path.join(profile_dir, name[:-len('.json')] + extension)
+            if os.path.exists(path): os.remove(path)
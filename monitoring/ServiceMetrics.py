@@ -0,0 +1,80 @@
+import os
+import time
+from contextlib import contextmanager
+
+from flask import g, request
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, \
+    generate_latest, multiprocess
+
+from monitoring.RequestProfiler import record_phase
+
+REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'Latency of http requests per route',
+                            ['route', 'method', 'status'])
+REQUESTS_IN_FLIGHT = Gauge('http_requests_in_flight', 'Http requests currently being served per route', ['route'],
+                           multiprocess_mode='livesum')
+UPSTREAM_LATENCY = Histogram('upstream_call_duration_seconds', 'Latency of calls to upstream providers',
+                             ['upstream', 'operation', 'outcome'])
+CACHE_LOOKUPS = Counter('cache_lookups_total', 'Cache lookups by outcome', ['cache', 'result'])
+
+
+def _registry():
+    """
+    Registry to expose on /metrics. Under several workers, e.g. gunicorn with PROMETHEUS_MULTIPROC_DIR set before
+    this module is imported, every worker writes its metrics there and any worker answers for all of them.
+    """
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ: return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def _route():
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+
+def instrument_app(app):
+    """
+    Time every request of the app per route template and expose all metrics on /metrics in Prometheus text format.
+    """
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_route = _route()
+        g.metrics_start = time.perf_counter()
+        REQUESTS_IN_FLIGHT.labels(g.metrics_route).inc()
+
+    @app.after_request
+    def _record_status(response):
+        g.metrics_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def _stop_timer(exception=None):
+        if 'metrics_start' not in g: return
+        REQUESTS_IN_FLIGHT.labels(g.metrics_route).dec()
+        REQUEST_LATENCY.labels(g.metrics_route, request.method, str(g.get('metrics_status', 500))) \
+            .observe(time.perf_counter() - g.metrics_start)
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        return generate_latest(_registry()), 200, {'Content-Type': CONTENT_TYPE_LATEST}
+
+
+@contextmanager
+def upstream_call(upstream: str, operation: str):
+    """
+    Time a call to an upstream provider, e.g. with upstream_call('yfinance', 'download'): ...
+    """
+    start = time.perf_counter()
+    outcome = 'error'
+    try:
+        yield
+        outcome = 'ok'
+    finally:
+        elapsed = time.perf_counter() - start
+        UPSTREAM_LATENCY.labels(upstream, operation, outcome).observe(elapsed)
+        record_phase(f"{upstream}.{operation}", elapsed)
+
+
+def record_cache_lookup(cache: str, hit: bool):
+    CACHE_LOOKUPS.labels(cache, 'hit' if hit else 'miss').inc()
@@ -0,0 +1,54 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# grpc and the eureka client are imported where used, startup runs these as warm-up steps
+
+_grpc_servers = []
+
+
+def is_serving_process() -> bool:
+    """
+    Whether this process serves requests, debug mode also runs a reloader parent process that must not warm up,
+    register or bind the gRPC port.
+    """
+    return os.environ.get('WERKZEUG_RUN_MAIN') == 'true'
+
+
+def serve_grpc(service: str, methods: dict, port: int):
+    """
+    Serve a service of mkt-data.proto over gRPC, e.g. serve_grpc('MarketDataService', {'GetHistory': ('unary_stream',
+    grpc_get_history, MarketData.HistoryRequest, MarketData.Ticker)}, 9083).
+    :param methods: method name to (cardinality, handler, request message, response message), cardinality being one of
+        unary_unary, unary_stream, stream_unary or stream_stream
+    """
+    import grpc
+    handler = grpc.method_handlers_generic_handler(service, {
+        name: getattr(grpc, f"{cardinality}_rpc_method_handler")(
+            behavior,
+            request_deserializer=request_type.FromString,
+            response_serializer=response_type.SerializeToString)
+        for name, (cardinality, behavior, request_type, response_type) in methods.items()
+    })
+    server = grpc.server(ThreadPoolExecutor(max_workers=10))
+    server.add_generic_rpc_handlers((handler,))
+    server.add_insecure_port(f"[::]:{port}")
+    server.start()
+    print(f"Serving gRPC on port: {port}")
+    _grpc_servers.append(server)  # keep a reference, the server stops once garbage collected
+    return server
+
+
+def register_with_eureka(app_name: str, port: int):
+    import py_eureka_client.eureka_client as eureka_client
+    # Initialize the Eureka client
+    try:
+        print("Attempting registering onto eureka server")
+        eureka_client.init(
+            eureka_server="http://localhost:2012/eureka",
+            app_name=app_name,
+            instance_port=port
+        )
+        print("Registered onto eureka server")
+    except Exception as e:
+        print("Failed to register onto eureka server ", e)
+        raise
@@ -0,0 +1,96 @@
+import argparse
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+services = {
+    'mkt': ('mkt/DataEngine.py', 8083),
+    'calc': ('mkt-calc/TwmMarketCalcPyEngine.py', 8101),
+    'calendar': ('calendar/CalendarEngine.py', 8089),
+}
+
+
+def _get(url: str):
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+    except (urllib.error.URLError, ConnectionError, TimeoutError):
+        return None, None
+
+
+def _stop(process: subprocess.Popen):
+    # the debug reloader serves from a child process, take the whole group down
+    if os.name == 'posix':
+        os.killpg(process.pid, signal.SIGTERM)
+    else:
+        process.terminate()
+    process.wait()
+
+
+def measure(script: str, port: int, service_args: list[str], timeout: float):
+    """
+    Launch a service once, from a scratch directory so its sqlite files do not pile up.
+    :return: seconds until /ping answered, seconds until /ready answered 200 and the last /ready body
+    """
+    with tempfile.TemporaryDirectory() as work_dir:
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, os.path.join(repo_root, script), '--port', str(port),
+                                    *service_args],
+                                   cwd=work_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                   start_new_session=os.name == 'posix')
+        try:
+            ping, ready, body = None, None, None
+            while time.perf_counter() - start < timeout:
+                if process.poll() is not None:
+                    raise RuntimeError(f"{script} exited with {process.returncode} before getting ready")
+                if ping is None and _get(f"http://127.0.0.1:{port}/ping")[0] == 200:
+                    ping = time.perf_counter() - start
+                if ping is not None:
+                    status, body = _get(f"http://127.0.0.1:{port}/ready")
+                    if status == 404:
+                        ready, body = ping, None  # older build without /ready, compare by /ping alone
+                        break
+                    if status == 200:
+                        ready = time.perf_counter() - start
+                        break
+                time.sleep(0.02)
+            return ping, ready, json.loads(body) if body else None
+        finally:
+            _stop(process)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time from launching a service to it answering /ping and /ready. '
+                                                 'Arguments after -- are passed on to the service')
+    parser.add_argument('--service', type=str, choices=sorted(services), help='Service to launch', required=True)
+    parser.add_argument('--port', type=int, help='Port to launch on, the service default when not supplied',
+                        default=None, required=False)
+    parser.add_argument('--runs', type=int, help='Number of launches', default=5, required=False)
+    parser.add_argument('--timeout', type=float, help='Seconds to wait for a launch to get ready', default=60,
+                        required=False)
+    args, service_args = parser.parse_known_args()
+    service_args = [arg for arg in service_args if arg != '--']
+    script, default_port = services[args.service]
+
+    pings, readies = [], []
+    for run in range(args.runs):
+        ping, ready, body = measure(script, args.port or default_port, service_args, args.timeout)
+        print(f"run {run + 1}: /ping after {ping if ping is None else f'{ping:.3f}s'}, "
+              f"/ready after {ready if ready is None else f'{ready:.3f}s'}")
+        if body: print(f"       warm-up steps {body['steps']}")
+        if ping is not None: pings.append(ping)
+        if ready is not None: readies.append(ready)
+
+    print(f"{args.service}: median /ping {statistics.median(pings):.3f}s" if pings else f"{args.service}: never pinged")
+    print(f"{args.service}: median /ready {statistics.median(readies):.3f}s" if readies else
+          f"{args.service}: never ready")
@@ -0,0 +1,121 @@
+import argparse
+import email.parser
+import itertools
+import threading
+
+from flask import Flask, request
+from werkzeug.serving import make_server
+
+batch_limit = 50  # calls Google takes in one batch request
+
+
+def error(status: int, message: str):
+    return {'error': {'code': status, 'message': message, 'errors': [{'message': message}]}}, status
+
+
+class CalendarStandIn:
+    """
+    In-memory stand-in for the part of the Calendar API the calendar engine uses: inserting events, listing them with
+    incremental sync tokens and batch requests. Point the engine at it with --calendarApiRoot.
+    """
+
+    def __init__(self, failures: dict[str, int] = None) -> None:
+        """
+        :param failures: event summary -> status to answer its insert with, to play Google rejecting or failing a write
+        """
+        self.failures = failures or {}
+        self.events = {}
+        self.changes = []  # ids of changed events in order, a sync token is the number of changes it has seen
+        self.oldest_sync_token = 0  # older tokens are answered 410 like the ones Google expired
+        self.batch_sizes = []  # calls per batch request received
+        self.root_url = None
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.app = Flask(__name__)
+        self.app.add_url_rule('/calendar/v3/calendars/<calendar_id>/events', 'insert', self.insert_event,
+                              methods=['POST'])
+        self.app.add_url_rule('/calendar/v3/calendars/<calendar_id>/events', 'list', self.list_events, methods=['GET'])
+        self.app.add_url_rule('/batch/calendar/v3', 'batch', self.batch, methods=['POST'])
+
+    def serve(self, port: int = 0):
+        """
+        Serve from a background thread, on a free port by default.
+        :return: the server, stop it with shutdown()
+        """
+        server = make_server('localhost', port, self.app, threaded=True)
+        self.root_url = f"http://localhost:{server.port}/"
+        threading.Thread(target=server.serve_forever, name='calendar-standin', daemon=True).start()
+        return server
+
+    def _changed(self, event: dict):
+        self.events[event['id']] = event
+        self.changes.append(event['id'])
+
+    def cancel(self, event_id: str):
+        with self._lock:
+            self._changed({**self.events[event_id], 'status': 'cancelled'})
+
+    def expire_sync_tokens(self):
+        with self._lock:
+            self.oldest_sync_token = len(self.changes)
+
+    def insert_event(self, calendar_id):
+        event = request.get_json()
+        if event.get('summary') in self.failures:
+            return error(self.failures[event['summary']], f"Stand-in failure for {event['summary']}")
+        if 'start' not in event or 'end' not in event: return error(400, 'Missing time.')
+        with self._lock:
+            event_id = event.get('id') or f"standin{next(self._ids)}"
+            if event_id in self.events: return error(409, 'The requested identifier already exists.')
+            event = {**event, 'id': event_id, 'status': 'confirmed',
+                     'htmlLink': f"https://www.google.com/calendar/event?eid={event_id}"}
+            self._changed(event)
+        return event
+
+    def list_events(self, calendar_id):
+        sync_token, page_token = request.args.get('syncToken'), request.args.get('pageToken')
+        max_results = int(request.args.get('maxResults', 250))
+        with self._lock:
+            if sync_token is None:
+                items = [event for event in self.events.values() if event['status'] != 'cancelled']
+            elif int(sync_token) < self.oldest_sync_token:
+                return error(410, 'Sync token is no longer valid, a full sync is required.')
+            else:
+                items = [self.events[event_id] for event_id in dict.fromkeys(self.changes[int(sync_token):])]
+            next_sync_token = str(len(self.changes))
+        offset = int(page_token or 0)
+        page = {'items': items[offset:offset + max_results]}
+        if offset + max_results < len(items):
+            page['nextPageToken'] = str(offset + max_results)
+        else:
+            page['nextSyncToken'] = next_sync_token
+        return page
+
+    def batch(self):
+        message = email.parser.Parser().parsestr(
+            f"Content-Type: {request.headers['Content-Type']}\n\n{request.get_data(as_text=True)}")
+        parts = message.get_payload()
+        if len(parts) > batch_limit: return error(400, f"Too many requests in batch, at most {batch_limit} are allowed")
+        self.batch_sizes.append(len(parts))
+
+        responses = []
+        client = self.app.test_client()
+        for part in parts:
+            # each part is a whole http request: request line, headers, a blank line and the body
+            request_line, _, rest = part.get_payload().replace('\r\n', '\n').partition('\n')
+            _, _, body = rest.partition('\n\n')
+            method, path, _ = request_line.split(' ', 2)
+            response = client.open(path, method=method, data=body, content_type='application/json')
+            content_id = part['Content-ID'].strip('<>')
+            responses.append(f"--standin\r\nContent-Type: application/http\r\n"
+                             f"Content-ID: <response-{content_id}>\r\n\r\n"
+                             f"HTTP/1.1 {response.status}\r\nContent-Type: application/json\r\n\r\n"
+                             f"{response.get_data(as_text=True)}\r\n")
+        return ''.join(responses) + '--standin--', 200, {'Content-Type': 'multipart/mixed; boundary=standin'}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port', type=int, help='Port number to use', default=9999, required=False)
+    args = parser.parse_args()
+    CalendarStandIn().app.run(port=args.port, threaded=True)
@@ -0,0 +1,55 @@
+import os
+import sys
+
+import pytest
+
+repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# the services import their sibling modules by name, as when run from their own directory. The repo root only goes at
+# the end of the path, like the services append it, as its calendar package shadows the standard library one
+sys.path[:] = [path for path in sys.path if os.path.abspath(path or os.curdir) != repo_root]
+sys.path.extend([os.path.join(repo_root, 'mkt'), os.path.join(repo_root, 'mkt-calc'),
+                 os.path.join(repo_root, 'calendar'), repo_root])
+
+# python -m pytest from the repo root starts pytest with the repo first on the path, whatever imported calendar by
+# then got the calendar package, swap in the standard library module
+shadowed = sys.modules.get('calendar')
+if hasattr(shadowed, '__path__'):
+    del sys.modules['calendar']
+    import calendar
+
+    for module in list(sys.modules.values()):
+        if getattr(module, 'calendar', None) is shadowed: module.calendar = calendar
+
+
+@pytest.fixture
+def data_engine(tmp_path):
+    import DataEngine
+    DataEngine.configure(['--corporateActionsDb', str(tmp_path / 'corporate-actions.db'),
+                          '--sharedCacheDb', str(tmp_path / 'mkt-cache.db')])
+    return DataEngine
+
+
+@pytest.fixture
+def calendar_standin():
+    from calendar_standin import CalendarStandIn
+    standin = CalendarStandIn()
+    server = standin.serve()
+    yield standin
+    server.shutdown()
+
+
+@pytest.fixture
+def calendar_engine(tmp_path, calendar_standin):
+    """
+    CalendarEngine talking to the stand-in, configured with the extra command line arguments passed in.
+    """
+    import CalendarEngine
+
+    def configure(*argv: str):
+        CalendarEngine.configure(['--calendarApiRoot', calendar_standin.root_url,
+                                  '--mirrorDb', str(tmp_path / 'calendar-mirror.db'),
+                                  '--journalDb', str(tmp_path / 'calendar-journal.db'), *argv])
+        CalendarEngine.create_token_if_expired()
+        return CalendarEngine
+
+    return configure
@@ -0,0 +1,56 @@
+def session(student: str, start_time: str = '1600') -> dict:
+    return {'Type': 'session', 'Data': {
+        'Mode': {'SessionMode': 'Online', 'Color': '#33b679'}, 'Student': student,
+        'Subject': {'SessionSubject': 'Math'}, 'SessionDate': '2026-11-02T00:00:00.000Z',
+        'SessionStartTime': start_time, 'SessionLengthInMinutes': 60}}
+
+
+def expiry(data: str, date: str = '2026-11-20') -> dict:
+    return {'Type': 'expiry', 'Data': {'Data': data, 'Date': f"{date}T00:00:00.000Z"}}
+
+
+def lib(book: str) -> dict:
+    return {'Type': 'lib', 'Data': {'BookName': book, 'BorrowDate': '2026-11-02T00:00:00.000Z',
+                                    'ReturnDate': '2026-11-23T00:00:00.000Z', 'ReturnedDate': None}}
+
+
+def test_batch_reports_results_per_item(calendar_engine, calendar_standin):
+    calendar_standin.failures = {'expiry: passport': 400, 'expiry: library card': 503}
+    engine = calendar_engine()
+
+    response = engine.app.test_client().post('/cal/batch', json=[
+        session('Sam'), expiry('passport'), lib('Dune'), {'Type': 'session'}, expiry('library card')])
+
+    assert response.status_code == 200
+    created, rejected, borrowed, invalid, failed = response.json
+    assert created['events'][0]['htmlLink'].endswith(f"eid={created['events'][0]['id']}")
+    assert rejected['events'][0]['status'] == 400
+    assert [calendar_standin.events[event['id']]['summary'] for event in borrowed['events']] == \
+        ['lib: borrowed - Dune', 'lib: to return - Dune']
+    assert invalid == {'type': 'session', 'error': "Invalid item: KeyError('Data')"}
+    assert failed['events'][0]['status'] == 503
+    assert calendar_standin.batch_sizes == [5]
+    assert sorted(event['summary'] for event in calendar_standin.events.values()) == \
+        ['lib: borrowed - Dune', 'lib: to return - Dune', 'online sam math']
+
+
+def test_batch_is_split_at_the_batch_limit(calendar_engine, calendar_standin):
+    engine = calendar_engine()
+
+    response = engine.app.test_client().post('/cal/batch', json=[expiry(f"card {index}") for index in range(51)])
+
+    assert response.status_code == 200
+    assert all('id' in item['events'][0] for item in response.json)
+    assert calendar_standin.batch_sizes == [50, 1]
+    assert len(calendar_standin.events) == 51
+
+
+def test_failed_write_answers_502_with_the_results(calendar_engine, calendar_standin):
+    calendar_standin.failures = {'lib: to return - dune': 400}
+    engine = calendar_engine()
+
+    response = engine.app.test_client().post('/cal/lib', json=lib('dune')['Data'])
+
+    assert response.status_code == 502
+    assert response.json['upstreamStatus'] == 400
+    assert ['id' in event for event in response.json['events']] == [True, False]
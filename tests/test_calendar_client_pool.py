@@ -0,0 +1,57 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+from google.oauth2.credentials import Credentials
+
+from CalendarClientPool import CalendarClientPool
+
+
+class SlowCredentials(Credentials):
+    """
+    Expired credentials whose refresh takes a while, counting refreshes and how many ever ran at the same time.
+    """
+
+    def __init__(self):
+        super().__init__(token='token0', refresh_token='refresh')
+        self.expiry = datetime(2000, 1, 1)
+        self.refreshes = 0
+        self.running = 0
+        self.most_running = 0
+
+    def refresh(self, request):
+        self.running += 1
+        self.most_running = max(self.most_running, self.running)
+        time.sleep(0.05)
+        self.refreshes += 1
+        self.token = f"token{self.refreshes}"
+        self.expiry = datetime.now() + timedelta(hours=1)
+        self.running -= 1
+
+
+def test_request_threads_and_refresher_refresh_one_at_a_time(tmp_path, monkeypatch):
+    creds = SlowCredentials()
+    pool = CalendarClientPool(creds, token_path=str(tmp_path / 'token.json'))
+    monkeypatch.setattr('google.auth.transport.requests.Request', lambda: None)
+    headers = [{} for _ in range(8)]
+
+    threads = [threading.Thread(target=creds.before_request, args=(None, 'POST', 'url', request_headers))
+               for request_headers in headers]
+    threads.append(threading.Thread(target=pool.refresh))
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+
+    assert creds.most_running == 1
+    assert creds.refreshes <= 2  # the background refresh goes ahead even when a request thread just refreshed
+    assert {request_headers['authorization'] for request_headers in headers} <= {'Bearer token1', 'Bearer token2'}
+    assert (tmp_path / 'token.json').exists()
+
+
+def test_a_rejected_token_is_refreshed_again(tmp_path):
+    creds = SlowCredentials()
+    CalendarClientPool(creds, token_path=str(tmp_path / 'token.json'))
+
+    creds.refresh(None)
+    creds.refresh(None)  # what AuthorizedHttp does on a 401 for a token that is still valid by its expiry
+
+    assert creds.refreshes == 2
@@ -0,0 +1,74 @@
+from datetime import datetime
+
+import pytest
+
+import CalendarEngine
+from CalendarEngine import calendar_zone, generate_event, generate_recurrence
+
+first_session = datetime(2026, 11, 3, 16, 0, tzinfo=calendar_zone)
+
+
+@pytest.mark.parametrize('start_date, start_time, duration, start, end', [
+    ('2026-11-03', '1600', 60, '2026-11-03T16:00:00-05:00', '2026-11-03T17:00:00-05:00'),
+    ('2026-11-01', '0100', 90, '2026-11-01T01:00:00-04:00', '2026-11-01T01:30:00-05:00'),
+    ('2026-03-08', '0130', 60, '2026-03-08T01:30:00-05:00', '2026-03-08T03:30:00-04:00'),
+])
+def test_sessions_last_their_duration_across_daylight_saving_changes(start_date, start_time, duration, start, end):
+    event = generate_event('online sam math', f"{start_date}T00:00:00.000Z", start_time, duration_minutes=duration)
+
+    assert (event['start']['dateTime'], event['end']['dateTime']) == (start, end)
+
+
+@pytest.mark.parametrize('day, start, end', [
+    ('2026-11-01', '2026-11-01T00:00:00-04:00', '2026-11-02T00:00:00-05:00'),
+    ('2026-03-08', '2026-03-08T00:00:00-05:00', '2026-03-09T00:00:00-04:00'),
+])
+def test_all_day_events_run_midnight_to_midnight(day, start, end):
+    event = generate_event('expiry: passport', f"{day}T00:00:00.000Z", all_day=True)
+
+    assert (event['start']['dateTime'], event['end']['dateTime']) == (start, end)
+    assert CalendarEngine.is_all_day(event)
+
+
+@pytest.mark.parametrize('spec, recurrence', [
+    ({'Frequency': 'weekly', 'Interval': 2, 'ByDay': ['mo', '-1FR'], 'Count': 10},
+     ['RRULE:FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,-1FR;COUNT=10']),
+    ({'Frequency': 'WEEKLY', 'ByDay': 'TU', 'Until': '2026-12-15', 'Exceptions': ['2026-11-10', '2026-11-24']},
+     ['RRULE:FREQ=WEEKLY;BYDAY=TU;UNTIL=20261216T045959Z',
+      'EXDATE;TZID=Canada/Eastern:20261110T160000,20261124T160000']),
+    ({'Frequency': 'MONTHLY', 'Interval': '3', 'Count': None, 'Exceptions': '2027-02-03'},
+     ['RRULE:FREQ=MONTHLY;INTERVAL=3', 'EXDATE;TZID=Canada/Eastern:20270203T160000']),
+])
+def test_recurrence_rules(spec, recurrence):
+    assert generate_recurrence(spec, first_session) == recurrence
+
+
+@pytest.mark.parametrize('spec', [
+    'FREQ=WEEKLY',
+    {'Frequency': 'HOURLY'},
+    {'Frequency': 'WEEKLY', 'Count': 4, 'Until': '2026-12-15'},
+    {'Frequency': 'WEEKLY', 'Interval': 0},
+    {'Frequency': 'WEEKLY', 'Interval': -1},
+    {'Frequency': 'WEEKLY', 'Interval': True},
+    {'Frequency': 'WEEKLY', 'Count': '4;BYHOUR=3'},
+    {'Frequency': 'WEEKLY', 'ByDay': ['MO', 'XX']},
+    {'Frequency': 'MONTHLY', 'ByDay': '60MO'},
+    {'Frequency': 'WEEKLY', 'Until': '15/12/2026'},
+])
+def test_bad_recurrence_is_rejected(spec):
+    with pytest.raises(ValueError):
+        generate_recurrence(spec, first_session)
+
+
+def test_session_with_bad_recurrence_answers_400(calendar_engine, calendar_standin):
+    engine = calendar_engine()
+
+    response = engine.app.test_client().post('/cal/session', json={
+        'Mode': {'SessionMode': 'Online', 'Color': '#33b679'}, 'Student': 'Sam',
+        'Subject': {'SessionSubject': 'Math'}, 'SessionDate': '2026-11-03T00:00:00.000Z',
+        'SessionStartTime': '1600', 'SessionLengthInMinutes': 60,
+        'Recurrence': {'Frequency': 'WEEKLY', 'Count': -3}})
+
+    assert response.status_code == 400
+    assert 'Count' in response.json['error']
+    assert calendar_standin.events == {}
@@ -0,0 +1,88 @@
+import sqlite3
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import CalendarJournal
+from CalendarJournal import DONE, FAILED, PENDING
+
+
+class StopWriter(BaseException):
+    pass
+
+
+def expiry(data: str) -> dict:
+    return {'Type': 'expiry', 'Data': {'Data': data, 'Date': '2026-11-20T00:00:00.000Z'}}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1_000_000.0)
+    monkeypatch.setattr(CalendarJournal, 'time', SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+def test_retries_back_off_until_max_attempts(tmp_path, clock):
+    journal = CalendarJournal.CalendarJournal(str(tmp_path / 'journal.db'), max_attempts=4, max_backoff_seconds=5)
+    journal.enqueue([('key', {'summary': 'expiry: passport'})])
+
+    waits = []
+    while journal.get_status('key')['status'] == PENDING:
+        assert journal.get_due(10) == [('key', {'summary': 'expiry: passport'})]
+        journal.mark_retry('key', 'Backend Error')
+        wait = 0
+        while not journal.get_due(10) and wait < 60:
+            clock.value += 1
+            wait += 1
+        waits.append(wait)
+
+    assert waits[:3] == [2, 4, 5]
+    assert journal.get_status('key') == {'key': 'key', 'status': FAILED, 'attempts': 4, 'error': 'Backend Error',
+                                         'htmlLink': None}
+
+
+def test_known_keys_are_not_queued_twice(tmp_path):
+    journal = CalendarJournal.CalendarJournal(str(tmp_path / 'journal.db'))
+
+    assert journal.enqueue([('a', {}), ('b', {})]) == [True, True]
+    assert journal.enqueue([('b', {}), ('c', {})]) == [False, True]
+    assert [key for key, _ in journal.get_due(10)] == ['a', 'b', 'c']
+
+
+def test_writer_marks_every_outcome(calendar_engine, calendar_standin):
+    calendar_standin.failures = {'expiry: rejected': 400, 'expiry: busy': 503}
+    engine = calendar_engine('--writeBehind', 'True')
+    client = engine.app.test_client()
+
+    queued = client.post('/cal/batch', json=[expiry('written'), expiry('rejected'), expiry('busy')],
+                         headers={'Idempotency-Key': 'import-1'})
+    keys = [item['queued'][0]['key'] for item in queued.json]
+    assert engine.write_due_events() == 3
+
+    assert queued.status_code == 202
+    assert [client.get(f"/cal/journal/{key}").json['status'] for key in keys] == [DONE, FAILED, PENDING]
+    assert client.post('/cal/batch', json=[expiry('written')], headers={'Idempotency-Key': 'import-1'}).json == \
+        [{'type': 'expiry', 'queued': [{'key': 'import-1:0:0', 'queued': False}]}]
+
+
+def test_writer_carries_on_after_a_failed_pass(calendar_engine, monkeypatch):
+    engine = calendar_engine('--writeBehind', 'True')
+    monkeypatch.setattr(engine, 'journal_poll_seconds', 0.01)
+    monkeypatch.setattr(engine, 'journal_writer', threading.current_thread())
+    key, = [entry['key'] for entry in engine.enqueue_events(engine.build_expiry_events(expiry('written')['Data']))]
+    get_due, readiness = engine.journal.get_due, []
+
+    def locked_once(limit):
+        readiness.append(engine.app.test_client().get('/ready').json['steps']['journal-writer'])
+        if len(readiness) == 1: raise sqlite3.OperationalError('database is locked')
+        if len(readiness) == 3: raise StopWriter()
+        return get_due(limit)
+
+    monkeypatch.setattr(engine.journal, 'get_due', locked_once)
+    with pytest.raises(StopWriter):
+        engine.drain_journal()
+
+    assert [step['state'] for step in readiness] == ['ready', 'failed', 'ready']
+    assert readiness[1]['error'] == "OperationalError('database is locked')"
+    assert engine.journal.get_status(key)['status'] == DONE
@@ -0,0 +1,96 @@
+from datetime import date, timedelta
+
+import pytest
+
+from CalendarClientPool import CalendarClientPool
+from CalendarMirror import CalendarMirror
+
+
+def timed(summary: str, start: str, end: str) -> dict:
+    return {'summary': summary, 'start': {'dateTime': start}, 'end': {'dateTime': end}}
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    return CalendarMirror(str(tmp_path / 'calendar-mirror.db'))
+
+
+@pytest.fixture
+def service(calendar_standin):
+    with CalendarClientPool(api_root=calendar_standin.root_url).client() as service:
+        yield service
+
+
+def add(service, event: dict) -> dict:
+    return service.events().insert(calendarId='primary', body=event).execute()
+
+
+def test_sync_pulls_only_changes_after_the_first_full_sync(mirror, service, calendar_standin):
+    math = add(service, timed('online sam math', '2026-11-02T16:00:00-05:00', '2026-11-02T17:00:00-05:00'))
+    add(service, timed('online sam physics', '2026-11-03T16:00:00-05:00', '2026-11-03T17:00:00-05:00'))
+    assert mirror.sync(service) == 2
+
+    add(service, timed('online sam chemistry', '2026-11-04T16:00:00-05:00', '2026-11-04T17:00:00-05:00'))
+    calendar_standin.cancel(math['id'])
+
+    assert mirror.sync(service) == 2
+    assert [event['summary'] for event in mirror.query(title='sam')] == ['online sam physics', 'online sam chemistry']
+    assert mirror.sync(service) == 0
+
+
+def test_expired_sync_token_falls_back_to_a_full_sync(mirror, service, calendar_standin):
+    math = add(service, timed('online sam math', '2026-11-02T16:00:00-05:00', '2026-11-02T17:00:00-05:00'))
+    add(service, timed('online sam physics', '2026-11-03T16:00:00-05:00', '2026-11-03T17:00:00-05:00'))
+    mirror.sync(service)
+
+    calendar_standin.cancel(math['id'])
+    calendar_standin.expire_sync_tokens()
+
+    assert mirror.sync(service) == 1
+    assert [event['summary'] for event in mirror.query()] == ['online sam physics']
+
+
+def test_duplicates_are_matched_on_their_start(mirror):
+    mirror.upsert([{**timed('online sam math', '2026-11-02T16:00:00-05:00', '2026-11-02T17:00:00-05:00'), 'id': 'a'},
+                   {'id': 'b', 'summary': 'expiry: passport', 'start': {'date': '2026-11-20'},
+                    'end': {'date': '2026-11-21'}}])
+
+    assert mirror.find('online sam math', '2026-11-02T21:00:00+00:00')['id'] == 'a'
+    assert mirror.find('online sam math', '2026-11-02T10:00:00-05:00') is None
+    assert mirror.find('online sam math', '2026-11-02T10:00:00-05:00', whole_day=True)['id'] == 'a'
+    assert mirror.find('expiry: passport', '2026-11-20T00:00:00-05:00', whole_day=True)['id'] == 'b'
+
+
+@pytest.mark.parametrize('day', ['2026-03-08', '2026-11-01', '2026-11-20'])
+def test_all_day_events_on_any_day_match_the_one_already_there(calendar_engine, calendar_standin, service, day):
+    next_day = (date.fromisoformat(day) + timedelta(days=1)).isoformat()
+    add(service, {'summary': 'expiry: passport', 'start': {'date': day}, 'end': {'date': next_day}})
+    engine = calendar_engine()
+    engine.calendar_mirror.sync(service)
+
+    response = engine.app.test_client().post('/cal/expiry', json={'Data': 'passport', 'Date': f"{day}T00:00:00.000Z"})
+
+    assert response.status_code == 200
+    assert response.json['events'][0]['duplicate']
+    assert len(calendar_standin.events) == 1
+
+
+@pytest.mark.parametrize('limit', ['abc', '-1', '0', '1.5', ''])
+def test_bad_query_limit_is_rejected(calendar_engine, limit):
+    response = calendar_engine().app.test_client().get(f"/cal/events?limit={limit}")
+
+    assert response.status_code == 400
+    assert 'limit' in response.json['error']
+
+
+def test_query_limit_is_capped(calendar_engine, monkeypatch):
+    engine = calendar_engine()
+    monkeypatch.setattr(engine, 'max_query_limit', 2)
+    engine.calendar_mirror.upsert([{**timed(f"online sam {subject}", f"2026-11-0{day}T16:00:00-05:00",
+                                            f"2026-11-0{day}T17:00:00-05:00"), 'id': subject}
+                                   for day, subject in enumerate(['math', 'physics', 'chemistry'], start=2)])
+    client = engine.app.test_client()
+
+    assert [event['id'] for event in client.get('/cal/events?limit=1').json] == ['math']
+    assert [event['id'] for event in client.get('/cal/events?limit=100000').json] == ['math', 'physics']
+    assert len(client.get('/cal/events').json) == 2
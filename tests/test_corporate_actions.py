@@ -0,0 +1,52 @@
+import pandas as pd
+import yfinance
+
+from model.output import mkt_data_pb2 as MarketData
+
+
+def fake_download(downloads: list, closes: dict):
+    """
+    Stand-in for yf.download answering with the column layout yfinance uses for the arguments it gets.
+    :param closes: symbol -> close price, None for a symbol whose download fails
+    """
+
+    def download(tickers, start=None, group_by='column', multi_level_index=False, **kwargs):
+        downloads.append(list(tickers))
+        dates = pd.date_range(end=pd.Timestamp.today().normalize() - pd.Timedelta(days=1), periods=3)
+        frames = {symbol: pd.DataFrame({'Close': [closes[symbol]] * 3, 'Dividends': [0.0, 0.9, 0.0],
+                                        'Stock Splits': [0.0, 0.0, 2.0]}, index=dates) for symbol in tickers}
+        if not multi_level_index: return frames[tickers[0]]
+        data = pd.concat(frames, axis=1)
+        return data if group_by == 'ticker' else data.swaplevel(axis=1)
+
+    return download
+
+
+def get_portfolio(client, query: str) -> MarketData.Portfolio:
+    response = client.get(f"/proto/mkt/corporate-actions?{query}")
+    assert response.status_code == 200
+    return MarketData.Portfolio.FromString(response.data)
+
+
+def test_single_symbol_gets_its_events(data_engine, monkeypatch):
+    downloads = []
+    monkeypatch.setattr(yfinance, 'download', fake_download(downloads, {'CM.TO': 60.0}))
+
+    portfolio = get_portfolio(data_engine.app.test_client(), 'symbols=CM.TO')
+
+    instrument, = portfolio.instruments
+    assert instrument.ticker.symbol == 'CM.TO'
+    assert [action.metaEventType for action in instrument.corporateActions] == ['DIVIDEND', 'SPLIT']
+    assert instrument.dividendYield == 0.9 / 60.0
+
+
+def test_symbols_are_fetched_once_a_day_unless_their_download_failed(data_engine, monkeypatch):
+    downloads = []
+    monkeypatch.setattr(yfinance, 'download', fake_download(downloads, {'CM.TO': 60.0, 'ENB.TO': None}))
+    client = data_engine.app.test_client()
+
+    get_portfolio(client, 'symbols=CM,ENB&country=CA&original=0')
+    portfolio = get_portfolio(client, 'symbols=CM,ENB&country=CA&original=0')
+
+    assert downloads == [['CM.TO', 'ENB.TO'], ['ENB.TO']]
+    assert [len(instrument.corporateActions) for instrument in portfolio.instruments] == [2, 0]
@@ -0,0 +1,77 @@
+import pandas as pd
+import pytest
+import yfinance
+
+from model.output import mkt_data_pb2 as MarketData
+
+
+def fake_yfinance(monkeypatch, closes: list[float], info: dict) -> list:
+    """
+    Answer yf.download with the supplied closes and yf.Ticker(...).info with the supplied info.
+    :return: the upstream calls made, as (call, symbol)
+    """
+    calls = []
+
+    def download(symbol, start=None, end=None, **kwargs):
+        calls.append(('download', symbol))
+        return pd.DataFrame({'Close': closes}, index=pd.date_range('2023-10-02', periods=len(closes)))
+
+    class Ticker:
+        def __init__(self, symbol):
+            self.symbol = symbol
+
+        @property
+        def info(self):
+            calls.append(('info', self.symbol))
+            return info
+
+    monkeypatch.setattr(yfinance, 'download', download)
+    monkeypatch.setattr(yfinance, 'Ticker', Ticker)
+    return calls
+
+
+equity_info = {'longName': 'Canadian Imperial Bank of Commerce', 'quoteType': 'EQUITY', 'sector': 'Financial Services'}
+
+
+@pytest.mark.parametrize('url', [
+    '/mkt?symbol=CM.TO&start=2023-10-01&end=2023-10-09&original=abc',
+    '/proto/mkt?symbol=CM.TO&start=2023-10-01&end=2023-10-09&original=2',
+    '/proto/mkt/corporate-actions?symbols=CM.TO&original=',
+])
+def test_bad_original_is_rejected(data_engine, monkeypatch, url):
+    calls = fake_yfinance(monkeypatch, [40.0], equity_info)
+
+    response = data_engine.app.test_client().get(url)
+
+    assert response.status_code == 400
+    assert 'original' in response.json['error']
+    assert calls == []
+
+
+def test_symbols_are_used_as_given_by_default(data_engine, monkeypatch):
+    fake_yfinance(monkeypatch, [40.0, 41.5], equity_info)
+    client = data_engine.app.test_client()
+
+    history = client.get('/mkt?symbol=CM.TO&start=2023-10-01&end=2023-10-09')
+    ticker = MarketData.Ticker.FromString(client.get('/proto/mkt?symbol=CM.TO&start=2023-10-01&end=2023-10-09').data)
+
+    assert history.status_code == 200
+    assert history.json['symbol'] == 'CM.TO'
+    assert [value['price'] for value in history.json['data']] == [40.0, 41.5]
+    assert ticker.symbol == 'CM.TO'
+    assert [value.date for value in ticker.data] == [20231002, 20231003]
+
+
+def test_names_and_types_of_a_failed_lookup_are_not_cached(data_engine, monkeypatch):
+    info = {}
+    calls = fake_yfinance(monkeypatch, [], info)
+
+    assert (data_engine.get_cached_ticker_name('ZWC.TO'), data_engine.get_cached_ticker_type('ZWC.TO')) == \
+        ('ZWC.TO', 'EQUITY')
+    info.update(longName='BMO Canadian High Dividend Covered Call ETF', quoteType='ETF')
+    assert (data_engine.get_cached_ticker_name('ZWC.TO'), data_engine.get_cached_ticker_type('ZWC.TO')) == \
+        ('BMO Canadian High Dividend Covered Call ETF', 'ETF')
+    assert (data_engine.get_cached_ticker_name('ZWC.TO'), data_engine.get_cached_ticker_type('ZWC.TO')) == \
+        ('BMO Canadian High Dividend Covered Call ETF', 'ETF')
+
+    assert calls == [('info', 'ZWC.TO')] * 3
@@ -0,0 +1,78 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+import yfinance
+
+dates = pd.date_range('2023-10-02', periods=5)
+
+
+def fake_download(monkeypatch, closes: dict) -> list:
+    """
+    Answer yf.download with a Close column per symbol found in closes, symbols not in it are left out as yfinance does
+    for a failed download.
+    :return: the symbols of every download
+    """
+    downloads = []
+
+    def download(tickers, start=None, end=None, multi_level_index=False, **kwargs):
+        downloads.append(list(tickers))
+        assert multi_level_index
+        frame = pd.DataFrame({symbol: closes[symbol] for symbol in tickers if symbol in closes}, index=dates)
+        return pd.concat({'Close': frame}, axis=1)
+
+    monkeypatch.setattr(yfinance, 'download', download)
+    return downloads
+
+
+closes = {'CM.TO': [40.0, 41.5, np.nan, 42.0, 42.5], 'ENB.TO': [45.0, 45.25, 45.5, 45.75, 46.0]}
+
+
+def expected(*symbols: str) -> pd.DataFrame:
+    columns = {symbol: closes.get(symbol, [np.nan] * len(dates)) for symbol in symbols}
+    return pd.DataFrame({'date': dates.values.astype('datetime64[ms]'), **columns})
+
+
+def test_arrow_stream_reads_back_batch_by_batch(data_engine, monkeypatch):
+    fake_download(monkeypatch, closes)
+    monkeypatch.setattr(data_engine, 'export_batch_rows', 2)
+
+    response = data_engine.app.test_client().get('/mkt/history/export?symbols=CM.TO,ENB.TO,GONE.TO,CM.TO')
+    reader = pa.ipc.open_stream(response.data)
+    batches = list(reader)
+
+    assert response.mimetype == 'application/vnd.apache.arrow.stream'
+    assert [batch.num_rows for batch in batches] == [2, 2, 1]
+    pd.testing.assert_frame_equal(pa.Table.from_batches(batches).to_pandas(date_as_object=False),
+                                  expected('CM.TO', 'ENB.TO', 'GONE.TO'), check_dtype=False)
+
+
+def test_parquet_reads_back_with_pandas(data_engine, monkeypatch):
+    downloads = fake_download(monkeypatch, closes)
+
+    response = data_engine.app.test_client().get('/mkt/history/export?symbols=CM,ENB&country=CA&original=0'
+                                                 '&format=parquet')
+    history = pd.read_parquet(io.BytesIO(response.data))
+
+    assert response.headers['Content-Type'] == 'application/vnd.apache.parquet'
+    assert downloads == [['CM.TO', 'ENB.TO']]
+    # pandas reads the date column as datetime.date objects
+    pd.testing.assert_frame_equal(history.assign(date=pd.to_datetime(history['date'])), expected('CM.TO', 'ENB.TO'),
+                                  check_dtype=False)
+
+
+@pytest.mark.parametrize('query, error', [
+    ('symbols=CM.TO&original=yes', 'original'),
+    ('symbols=CM.TO&format=csv', 'format'),
+    ('symbols=', 'symbols'),
+])
+def test_bad_export_is_rejected(data_engine, monkeypatch, query, error):
+    downloads = fake_download(monkeypatch, closes)
+
+    response = data_engine.app.test_client().get(f"/mkt/history/export?{query}")
+
+    assert response.status_code == 400
+    assert error in response.json['error']
+    assert downloads == []
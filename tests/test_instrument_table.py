@@ -0,0 +1,39 @@
+import io
+
+import pandas as pd
+import pytest
+
+from InstrumentTable import TRADE_DTYPE, read_trades
+
+header = 'Stock code,Qty,Trade date,Price per share,Sector,Account\n'
+
+
+def read(csv: str, **kwargs):
+    return pd.read_csv(io.StringIO(csv), **kwargs)
+
+
+def test_trades_are_read_column_by_column():
+    types = []
+    data_source = read(header + 'CM,10,2023-10-02,61.5,Financial,TFSA\n'
+                                ',,,,,\n'
+                                'Total invested,,,2000,,\n'
+                                'ENB,5,2023-11-15,45.25,Energy,NR\n'
+                                'CM,4,2024-01-03,58,Financial,NR\n')
+
+    trades = read_trades(data_source, lambda code: f"{code}.TO", lambda symbol: types.append(symbol) or 'EQUITY',
+                         exempt_tickers=['Total invested'])
+
+    assert trades.dtype == TRADE_DTYPE
+    assert trades.tolist() == [('CM.TO', 10.0, 20231002, 61.5, 'Financial', 'TFSA', 'EQUITY'),
+                               ('ENB.TO', 5.0, 20231115, 45.25, 'Energy', 'NR', 'EQUITY'),
+                               ('CM.TO', 4.0, 20240103, 58.0, 'Financial', 'NR', 'EQUITY')]
+    assert sorted(types) == ['CM.TO', 'ENB.TO']
+    assert trades['account'][1] is trades['account'][2]
+
+
+@pytest.mark.parametrize('dtype', [None, 'str'])
+def test_empty_portfolio_has_no_trades(dtype):
+    trades = read_trades(read(header, dtype=dtype), lambda code: f"{code}.TO", lambda symbol: 'EQUITY')
+
+    assert trades.dtype == TRADE_DTYPE
+    assert len(trades) == 0
@@ -0,0 +1,33 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# import a service the way it is started and configure it, then print which heavy modules got loaded
+configure = """
+import importlib, json, sys
+service = importlib.import_module(sys.argv[1])
+service.configure(json.loads(sys.argv[2]))
+print(json.dumps(sorted(module for module in json.loads(sys.argv[3]) if module in sys.modules)))
+"""
+
+
+@pytest.mark.parametrize('directory, service, argv, heavy', [
+    ('mkt', 'DataEngine', ['--corporateActionsDb', '{tmp}/corporate-actions.db', '--sharedCacheDb', '{tmp}/cache.db'],
+     ['yfinance', 'pandas', 'pyarrow', 'grpc', 'py_eureka_client', 'InstrumentTable']),
+    ('mkt-calc', 'TwmMarketCalcPyEngine', [], ['cvxpy', 'grpc', 'py_eureka_client']),
+    ('calendar', 'CalendarEngine', ['--mirrorDb', '{tmp}/mirror.db', '--journalDb', '{tmp}/journal.db',
+                                    '--writeBehind', 'True'],
+     ['googleapiclient.discovery', 'google_auth_oauthlib', 'google.auth.transport.requests']),
+])
+def test_configure_leaves_heavy_modules_to_warm_up(tmp_path, directory, service, argv, heavy):
+    argv = json.dumps([arg.format(tmp=tmp_path) for arg in argv])
+
+    loaded = subprocess.run([sys.executable, '-c', configure, service, argv, json.dumps(heavy)],
+                            cwd=os.path.join(repo_root, directory), check=True, capture_output=True, text=True)
+
+    assert json.loads(loaded.stdout) == []
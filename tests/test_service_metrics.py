@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+
+repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# one worker: serve /ping a number of times, then print what its /metrics reports
+worker = """
+import sys
+from flask import Flask
+sys.path.append(sys.argv[1])
+from monitoring.ServiceMetrics import instrument_app
+
+app = Flask(__name__)
+instrument_app(app)
+app.route('/ping')(lambda: 'pong')
+client = app.test_client()
+for _ in range(int(sys.argv[2])): client.get('/ping')
+print(client.get('/metrics').get_data(as_text=True))
+"""
+
+
+def run_worker(requests: int, env: dict) -> str:
+    return subprocess.run([sys.executable, '-c', worker, repo_root, str(requests)], env=env, check=True,
+                          capture_output=True, text=True).stdout
+
+
+def served(metrics: str) -> float:
+    return sum(float(line.split()[-1]) for line in metrics.splitlines()
+               if line.startswith('http_request_duration_seconds_count{') and 'route="/ping"' in line)
+
+
+def test_any_worker_reports_the_requests_of_all_workers(tmp_path):
+    env = {**os.environ, 'PROMETHEUS_MULTIPROC_DIR': str(tmp_path)}
+
+    run_worker(3, env)
+    metrics = run_worker(2, env)
+
+    assert served(metrics) == 5
+    assert 'http_requests_in_flight{route="/ping"} 0.0' in metrics
+
+
+def test_single_process_reports_its_own_requests():
+    env = {key: value for key, value in os.environ.items() if key != 'PROMETHEUS_MULTIPROC_DIR'}
+
+    assert served(run_worker(2, env)) == 2
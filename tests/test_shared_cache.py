@@ -0,0 +1,99 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import SharedCache as SharedCacheModule
+from SharedCache import SharedCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1_000_000.0)
+    monkeypatch.setattr(SharedCacheModule, 'time', SimpleNamespace(time=lambda: now.value, sleep=time.sleep))
+    return now
+
+
+def test_concurrent_misses_load_once(tmp_path):
+    db_path = str(tmp_path / 'cache.db')
+    workers = [SharedCache(db_path) for _ in range(6)]
+    loads, results = [], []
+    start = threading.Barrier(len(workers))
+
+    def load():
+        loads.append(threading.current_thread().name)
+        time.sleep(0.2)
+        return b'CM.TO history', True
+
+    def lookup(cache: SharedCache):
+        start.wait()
+        results.append(cache.get_or_load('ticker_history', 'CM.TO', load, 60, poll_seconds=0.01))
+
+    threads = [threading.Thread(target=lookup, args=(cache,)) for cache in workers]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+
+    assert len(loads) == 1
+    assert sorted(results) == [(b'CM.TO history', False)] + [(b'CM.TO history', True)] * 5
+
+
+def test_values_not_cacheable_are_served_but_not_stored(tmp_path):
+    cache = SharedCache(str(tmp_path / 'cache.db'))
+    loads = []
+
+    def load():
+        loads.append(1)
+        return b'{}', len(loads) > 1
+
+    assert cache.get_or_load('ticker_info', 'CM.TO', load, 60) == (b'{}', False)
+    assert cache.get_or_load('ticker_info', 'CM.TO', load, 60) == (b'{}', False)
+    assert cache.get_or_load('ticker_info', 'CM.TO', load, 60) == (b'{}', True)
+    assert len(loads) == 2
+
+
+def test_failed_load_releases_its_lease(tmp_path):
+    cache = SharedCache(str(tmp_path / 'cache.db'), lease_seconds=30)
+
+    def fail():
+        raise ConnectionError('upstream down')
+
+    with pytest.raises(ConnectionError):
+        cache.get_or_load('ticker_info', 'CM.TO', fail, 60)
+    started = time.perf_counter()
+
+    assert cache.get_or_load('ticker_info', 'CM.TO', lambda: (b'{}', True), 60) == (b'{}', False)
+    assert time.perf_counter() - started < 1
+
+
+def test_lease_of_a_stuck_worker_runs_out(tmp_path, clock):
+    stuck, waiting = (SharedCache(str(tmp_path / 'cache.db'), lease_seconds=5) for _ in range(2))
+    assert stuck._acquire_lease('ticker_info', 'CM.TO')
+    clock.value += 6
+
+    assert waiting.get_or_load('ticker_info', 'CM.TO', lambda: (b'{}', True), 60) == (b'{}', False)
+
+
+def test_entries_expire_after_their_ttl(tmp_path, clock):
+    cache = SharedCache(str(tmp_path / 'cache.db'))
+    cache.put('ticker_name', 'CM.TO', b'Canadian Imperial Bank of Commerce', 60)
+
+    clock.value += 59
+    assert cache.get('ticker_name', 'CM.TO') == b'Canadian Imperial Bank of Commerce'
+    clock.value += 2
+    assert cache.get('ticker_name', 'CM.TO') is None
+
+
+def test_least_recently_read_entries_are_evicted(tmp_path, clock):
+    cache = SharedCache(str(tmp_path / 'cache.db'), max_entries=2, touch_seconds=0, evict_every=1)
+    cache.put('ticker_name', 'CM.TO', b'CIBC', 60)
+    clock.value += 1
+    cache.put('ticker_name', 'ENB.TO', b'Enbridge', 60)
+    clock.value += 1
+    cache.get('ticker_name', 'CM.TO')
+    clock.value += 1
+
+    cache.put('ticker_name', 'ZWC.TO', b'BMO Covered Call', 60)
+
+    assert [cache.get('ticker_name', symbol) for symbol in ('CM.TO', 'ENB.TO', 'ZWC.TO')] == \
+        [b'CIBC', None, b'BMO Covered Call']
@@ -0,0 +1,39 @@
+import socket
+import time
+
+import grpc
+
+from model.output import mkt_data_pb2 as MarketData
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('localhost', 0))
+        return s.getsockname()[1]
+
+
+def test_app_factory_starts_what_the_debug_server_does(tmp_path):
+    import DataEngine
+    port = free_port()
+
+    app = DataEngine.create_app(['--grpcPort', str(port),
+                                 '--corporateActionsDb', str(tmp_path / 'corporate-actions.db'),
+                                 '--sharedCacheDb', str(tmp_path / 'cache.db')])
+    client = app.test_client()
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        steps = client.get('/ready').json['steps']
+        if all(steps.get(step, {}).get('state') not in (None, 'pending') for step in ('imports', 'grpc')): break
+        time.sleep(0.05)
+
+    assert (steps['imports']['state'], steps['grpc']['state']) == ('ready', 'ready')
+    with grpc.insecure_channel(f"localhost:{port}") as channel:
+        get_portfolio = channel.unary_unary('/MarketDataService/GetPortfolio',
+                                            request_serializer=MarketData.PortfolioRequest.SerializeToString,
+                                            response_deserializer=MarketData.Portfolio.FromString)
+        try:
+            get_portfolio(MarketData.PortfolioRequest(direction='x'), timeout=10)
+            code = grpc.StatusCode.OK
+        except grpc.RpcError as e:
+            code = e.code()
+    assert code == grpc.StatusCode.INVALID_ARGUMENT